@@ -0,0 +1,122 @@
+"""
+GeoTIFF Quality Report Generator
+Per-file analysis, safe to run in worker processes
+"""
+
+import os
+import time
+
+import numpy as np
+import rasterio
+
+from app.area import footprint_area, valid_footprint_area
+from app.prefetch import DEFAULT_PREFETCH_DEPTH
+from app.stats import approximate_band_statistics, band_statistics
+
+
+def analyze_file(filename, filepath, approx_pixels=None, prefetch_depth=DEFAULT_PREFETCH_DEPTH, statistics=True):
+    """Analyze a single GeoTIFF and return its picklable file record
+
+    With approx_pixels set, band statistics are estimated from an overview or
+    decimated read of at most that many pixels. prefetch_depth is the number
+    of blocks read ahead while the current block is reduced. With statistics
+    False only the header is read and the record is marked 'header_only'.
+
+    The record's 'diagnostics' entry holds the wall/CPU time spent on the
+    file, the time to open it and compute statistics, and I/O counters.
+    """
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    diagnostics = {'open_s': 0.0, 'stats_s': 0.0, 'blocks_read': 0, 'bytes_read': 0}
+    try:
+        with rasterio.open(filepath) as src:
+            diagnostics['open_s'] = time.perf_counter() - wall
+            record = read_file_record(src, filename, filepath, approx_pixels, prefetch_depth, diagnostics,
+                                      statistics)
+    except Exception as e:
+        record = {'file': filename, 'path': filepath, 'error': str(e)}
+
+    diagnostics['wall_s'] = time.perf_counter() - wall
+    diagnostics['cpu_s'] = time.process_time() - cpu
+    record['diagnostics'] = diagnostics
+    return record
+
+
+def read_file_record(src, filename, filepath, approx_pixels=None, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                     diagnostics=None, statistics=True):
+    """Read everything the report needs from an open GeoTIFF into a file record"""
+    record = {
+        'file': filename,
+        'path': filepath,
+        'width': src.width,
+        'height': src.height,
+        'count': src.count,
+        'dtype': src.dtypes[0] if src.count > 0 else None,
+        'crs': src.crs.to_string() if src.crs else None,
+        'transform': tuple(src.transform)[:6],
+        'bounds': tuple(src.bounds),
+        'nodata': src.nodata,
+        'file_size': os.path.getsize(filepath),
+        'area': footprint_area(src.crs, tuple(src.transform)[:6], src.width, src.height),
+        'valid_area': None,
+        'bands': None,
+    }
+
+    if not statistics:
+        record['header_only'] = True
+        return record
+
+    # Statistics for every band, computed in one pass over the pixels
+    if src.count > 0:
+        # Cell areas vary by row in geographic CRSs, so valid pixels are counted per row
+        geographic = src.crs is not None and src.crs.is_geographic
+        row_valid = np.zeros(src.height) if geographic else None
+        start = time.perf_counter()
+        try:
+            record['bands'] = analyze_band_statistics(src, filename, approx_pixels, prefetch_depth, diagnostics,
+                                                      row_valid)
+        except Exception as e:
+            record['band_error'] = str(e)
+        if diagnostics is not None:
+            diagnostics['stats_s'] = time.perf_counter() - start
+
+        # Area of band 1's valid pixels
+        if record['bands'] and record['bands'][0]['total_pixels']:
+            first = record['bands'][0]
+            if geographic:
+                record['valid_area'] = valid_footprint_area(src.crs, record['transform'], row_valid)
+            else:
+                record['valid_area'] = record['area'] * first['valid_pixels'] / first['total_pixels']
+
+    return record
+
+
+def analyze_band_statistics(src, filename, approx_pixels=None, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                            counters=None, row_valid=None):
+    """Analyze statistics for every band of a raster
+
+    Returns one statistics dict per band, in band order. The number of
+    valid band 1 pixels in each row is added to the optional row_valid array.
+    """
+    factor = 1
+    if approx_pixels:
+        stats, sampled_pixels, factor = approximate_band_statistics(src, approx_pixels, prefetch_depth, counters,
+                                                                    row_valid)
+    else:
+        stats, sampled_pixels = band_statistics(src, prefetch_depth, counters, row_valid)
+
+    bands = []
+    for index in range(src.count):
+        band = {'file': filename, 'band': index + 1, 'total_pixels': sampled_pixels}
+        band.update(stats.band(index))
+        if factor > 1:
+            # Scale sample counts back up to the full-resolution pixel grid
+            total_pixels = src.width * src.height
+            band.update({
+                'valid_pixels': round(band['valid_pixels'] * total_pixels / sampled_pixels),
+                'total_pixels': total_pixels,
+                'approximate': True,
+                'sample_factor': factor
+            })
+        bands.append(band)
+    return bands
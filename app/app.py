@@ -3,40 +3,104 @@ GeoTIFF Quality Report Generator
 Main application module
 """
 
-import wx
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+import argparse
+import heapq
 import os
+import time
 from datetime import datetime
-import rasterio
-import numpy as np
-from collections import defaultdict
-import math
-import csv
-from pathlib import Path
+from collections import defaultdict, deque
+import statistics
 import warnings
 
+# wx, reportlab, rasterio and numpy are imported where they are first needed,
+# so headless and fully cached runs never pay for the GUI or raster stacks
+from app.cache import ANALYZER_VERSION, CACHE_FILENAME, ResultCache
+from app.diagnostics import PhaseTimer, close_diagnostics_log, log_event, open_diagnostics_log
+from app.discovery import SORT_RUN_SIZE, iter_geotiff_entries
+from app.export import EXPORT_FORMATS
+from app.issues import (LARGE_FILE, MISSING_CRS, NO_NODATA, NOT_ANALYZED, READ_ERROR, SMALL_FILE,
+                        SUSPICIOUS_VALUES, IssueLog)
+from app.prefetch import DEFAULT_PREFETCH_DEPTH
+from app.shard import (PARTIAL_SUFFIX, aggregates_match, check_shards, in_shard, iter_partial, merge_aggregates,
+                       parse_shard, read_partial_header, shard_aggregates, write_partial)
+from app.sketch import RELATIVE_ACCURACY, QuantileSketch
+from app.spatial import find_overlapping_pairs
+from app.watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, FolderWatcher
+from app.workers import ignore_interrupts
+
 warnings.filterwarnings('ignore')
 
+# Longest list of overlapping file pairs written to the report
+MAX_LISTED_OVERLAPS = 100
+
+# Slowest files listed in the run diagnostics appendix by default
+DIAGNOSTICS_SLOWEST = 10
+
+# Orders in which triaged files get their pixel statistics
+PRIORITIES = ('input', 'flagged', 'largest')
+
 
 class GeoTiffAnalyzer:
     """Main class for analyzing GeoTIFF files and generating quality reports"""
     
-    def __init__(self):
+    def __init__(self, workers=1, approx_pixels=None, cache_path=None, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                 diagnostics=None, volume_size=None, triage=False, priority='input', time_budget=None):
         self.folder = None
+        self.workers = workers or os.cpu_count() or 1
+        self.approx_pixels = approx_pixels
+        self.prefetch_depth = prefetch_depth
+        self.cache_path = cache_path
+        # Number of slowest files listed in the diagnostics appendix; None
+        # leaves the appendix out of the report
+        self.diagnostics = diagnostics
+        self.timer = PhaseTimer()
+        # Files per detailed-analysis volume; None keeps the details in the
+        # main report
+        self.volume_size = volume_size
+        self.volume_paths = []
+        # Header-only pass and preliminary report before the pixel pass,
+        # which runs in priority order within an optional budget (seconds).
+        # preliminary is True while only header records are loaded
+        self.triage = triage or priority != 'input' or time_budget is not None
+        self.priority = priority
+        self.time_budget = time_budget
+        self.preliminary = False
+        # Watch mode keeps a warm process pool and each file's histograms,
+        # so changed files can be folded in again without re-reading others
+        self.executor = None
+        self.retain_histograms = False
+        # (index, count) of the subset analyzed in shard mode, and each
+        # file's position in the full discovery order
+        self.shard = None
+        self.job_order = {}
+        self.roots = []
+        self.recursive = False
+        self.include = ()
+        self.exclude = ()
+        self.output_path = None
         self.geotiff_files = []
-        self.datum_summary = defaultdict(int)
-        self.total_area = 0
-        self.pixel_size_summary = defaultdict(int)
-        self.quality_issues = []
-        self.raster_stats = []
+        self._reset_summaries()
         self.canvas = None
         self.text = None
         self.width = None
         self.height = None
     
+    def _reset_summaries(self):
+        """Clear the file records and everything aggregated from them"""
+        self.datum_summary = defaultdict(int)
+        self.total_area = 0
+        self.valid_area = 0
+        self.pixel_size_summary = defaultdict(int)
+        self.quality_issues = IssueLog()
+        self.raster_stats = []
+        self.value_sketches = {}
+        self.file_records = []
+        self.header_only_files = 0
+    
     def select_folder(self):
         """Open folder selection dialog"""
+        import wx
+        
         app = wx.App(False)
         dlg = wx.DirDialog(None, "Select folder containing GeoTIFF files", style=wx.DD_DEFAULT_STYLE)
         dlg.ShowModal()
@@ -46,15 +110,39 @@ class GeoTiffAnalyzer:
         
         if not self.folder:
             return False
-            
-        self.geotiff_files = [f for f in os.listdir(self.folder) if f.lower().endswith(('.tif', '.tiff'))]
+        
+        self.roots = [self.folder]
         return True
     
-    def setup_pdf(self):
+    def iter_jobs(self):
+        """Yield (name, path) for each file to analyze, discovering files lazily"""
+        if self.geotiff_files:
+            for filename in list(self.geotiff_files):
+                yield filename, os.path.join(self.folder, filename)
+            return
+        
+        roots = self.roots or [self.folder]
+        files = iter_geotiff_entries(roots, self.recursive, self.include, self.exclude)
+        for seq, (filename, filepath, relpath) in enumerate(files):
+            if self.shard and not in_shard(relpath, self.shard):
+                continue
+            self.job_order[filepath] = seq
+            self.geotiff_files.append(filename)
+            yield filename, filepath
+    
+    def report_path(self):
+        """Resolve the PDF path, defaulting to a timestamped file in the folder"""
+        if not self.output_path:
+            timestamp = datetime.now().strftime("%Y%m%d%H%M")
+            self.output_path = os.path.join(self.folder, f"Quality-Report-{timestamp}.pdf")
+        return self.output_path
+    
+    def setup_pdf(self, path=None):
         """Initialize PDF canvas and text object"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M")
-        filename = f"Quality-Report-{timestamp}.pdf"
-        path = os.path.join(self.folder, filename)
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        
+        path = path or self.report_path()
         
         self.canvas = canvas.Canvas(path, pagesize=A4)
         self.width, self.height = A4
@@ -62,6 +150,19 @@ class GeoTiffAnalyzer:
         
         return path
     
+    def _use_volumes(self):
+        """True when the detailed file analysis goes to separate volumes"""
+        return bool(self.volume_size) and not self.preliminary
+    
+    def volume_path(self, pdf_path, number):
+        """Path of one detailed-analysis volume next to the main report"""
+        return f"{os.path.splitext(pdf_path)[0]}.volume-{number:03d}.pdf"
+    
+    def _iter_volumes(self):
+        """Yield (number, records) for each detailed-analysis volume"""
+        for start in range(0, len(self.file_records), self.volume_size):
+            yield start // self.volume_size + 1, self.file_records[start:start + self.volume_size]
+    
     def add_line(self, line):
         """Add a line to the PDF, handling page breaks"""
         self.text.textLine(line)
@@ -79,85 +180,289 @@ class GeoTiffAnalyzer:
         self.add_line("-" * len(header))
         self.text.setFont("Helvetica", 10)
     
+    def triage_files(self):
+        """Read only the headers of all GeoTIFF files for a preliminary report
+
+        Headers are read in the process pool like full analyses; files with
+        a cached full record use it instead.
+        """
+        print("Reading file headers...")
+        self.preliminary = True
+        cache = self._open_cache()
+        try:
+            with self.timer.phase('triage_files'):
+                for record in self._analyze_records(self.iter_jobs(), cache, header_only=True):
+                    self._add_record(record)
+        finally:
+            if cache:
+                cache.close()
+    
     def analyze_files(self):
-        """Analyze all GeoTIFF files in the selected folder"""
+        """Analyze all GeoTIFF files in the selected folder
+
+        After triage_files, the triaged files are analyzed in priority order
+        and their header-only records are replaced.
+        """
         print("Analyzing files...")
         
-        for filename in self.geotiff_files:
-            filepath = os.path.join(self.folder, filename)
-            try:
-                with rasterio.open(filepath) as src:
-                    self._analyze_single_file(src, filename, filepath)
-            except Exception as e:
-                self.quality_issues.append(f"{filename}: Error reading file - {str(e)}")
+        cache = self._open_cache()
+        try:
+            with self.timer.phase('analyze_files'):
+                if self.file_records:
+                    self._deepen_records(cache)
+                else:
+                    for record in self._analyze_records(self.iter_jobs(), cache):
+                        self._add_record(record)
+            
+            if cache:
+                cache.prune(record['path'] for record in self.file_records)
+                print(f"Cache: {cache.hits} files reused, {cache.misses} analyzed")
+        finally:
+            if cache:
+                cache.close()
     
-    def _analyze_single_file(self, src, filename, filepath):
-        """Analyze a single GeoTIFF file"""
+    def _open_cache(self):
+        """Open the result cache for the current analysis settings, if enabled"""
+        if not self.cache_path:
+            return None
+        return ResultCache(self.cache_path, f"{ANALYZER_VERSION}:approx={self.approx_pixels}")
+    
+    def _deepen_records(self, cache):
+        """Replace header-only records with full ones in priority order
+
+        Once the time budget is spent no further files are started; their
+        header-only records are kept and reported as not deeply analyzed.
+        """
+        records = list(self.file_records)
+        order = self._priority_order(records)
+        deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        
+        jobs = ((records[index]['file'], records[index]['path']) for index in order)
+        for index, record in zip(order, self._analyze_records(jobs, cache, deadline)):
+            if record is not None:
+                records[index] = record
+            elif records[index].get('header_only'):
+                # Not deeply analyzed; its header read time says nothing
+                records[index].pop('diagnostics', None)
+        
+        # Fold the final records in input order
+        self.preliminary = False
+        self._reset_summaries()
+        for record in records:
+            self._add_record(record)
+    
+    def _priority_order(self, records):
+        """Indices of the triaged records in the order they are analyzed"""
+        order = list(range(len(records)))
+        if self.priority == 'flagged':
+            # Files with header issues first; sort is stable within each group
+            order.sort(key=lambda index: records[index]['path'] not in self.quality_issues.by_file)
+        elif self.priority == 'largest':
+            order.sort(key=lambda index: -records[index].get('file_size', 0))
+        return order
+    
+    def _analyze_records(self, jobs, cache=None, deadline=None, header_only=False):
+        """Yield file records in input order, reusing cached records and
+        analyzing the rest serially or in a process pool
+
+        Files that would need analyzing after the deadline (a time.monotonic
+        value) yield None instead. With header_only set only headers are
+        read, and those header-only records are never stored in the cache."""
+        # The raster stack and the process pool are only started once a
+        # file actually needs analyzing
+        analyze_file = None
+        executor = self.executor
+        owns_executor = False
+        
+        # Keep a bounded number of files in flight and collect them in
+        # submission order so the report does not depend on worker timing
+        max_pending = self.workers * 4
+        pending = deque()
+        try:
+            for filename, filepath in jobs:
+                record, key = cache.lookup(filepath) if cache else (None, None)
+                if record is not None:
+                    # Timings of the run that produced the cached record do
+                    # not describe this run
+                    record.pop('diagnostics', None)
+                    record.update({'file': filename, 'path': filepath})
+                    pending.append((None, record, False))
+                    continue
+                
+                if deadline is not None and time.monotonic() >= deadline:
+                    pending.append((None, None, False))
+                    continue
+                
+                if analyze_file is None:
+                    from app.analysis import analyze_file
+                    if executor is None and self.workers > 1:
+                        from concurrent.futures import ProcessPoolExecutor
+                        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts)
+                        owns_executor = True
+                
+                options = self._analysis_options()
+                if header_only:
+                    options['statistics'] = False
+                    key = None
+                if executor:
+                    pending.append((key, executor.submit(analyze_file, filename, filepath, **options), True))
+                else:
+                    pending.append((key, analyze_file(filename, filepath, **options), False))
+                
+                while len(pending) >= max_pending or (pending and not executor):
+                    yield self._collect_record(pending.popleft(), cache)
+            while pending:
+                yield self._collect_record(pending.popleft(), cache)
+        finally:
+            if owns_executor:
+                executor.shutdown(cancel_futures=True)
+    
+    def _analysis_options(self):
+        """Keyword arguments passed to analyze_file for every file"""
+        return {'approx_pixels': self.approx_pixels, 'prefetch_depth': self.prefetch_depth}
+    
+    def _collect_record(self, item, cache):
+        """Resolve a pending analysis and store fresh results in the cache"""
+        key, result, is_future = item
+        if is_future:
+            result = result.result()
+        # Only fresh analyses carry diagnostics; cache hits have them removed
+        if result is not None and 'diagnostics' in result:
+            log_event('file', file=result['file'], **result['diagnostics'])
+        if cache and key is not None:
+            cache.store(key, result)
+        return result
+    
+    def _add_record(self, record):
+        """Append a file record and fold it into the summaries"""
+        self.file_records.append(record)
+        self._fold_record(record)
+    
+    def _fold_record(self, record):
+        """Fold a file record into the summaries and quality checks"""
+        filename = record['file']
+        path = record['path']
+        
+        if 'error' in record:
+            self.quality_issues.add(READ_ERROR, path, filename, record['error'])
+            return
+        
         # CRS/Datum analysis
-        crs_string = src.crs.to_string() if src.crs else 'No CRS'
-        self.datum_summary[crs_string] += 1
+        self.datum_summary[record['crs'] or 'No CRS'] += 1
         
-        # Area calculation (approximate)
-        transform = src.transform
-        pixel_area = abs(transform.a * transform.e)
-        file_area = pixel_area * src.width * src.height
-        self.total_area += file_area
+        # Ground area in m² (ellipsoidal for geographic CRSs)
+        a, b, c, d, e, f = record['transform']
+        self.total_area += record['area']
+        self.valid_area += record['valid_area'] or 0
         
         # Pixel size analysis
-        pixel_size = f"{abs(transform.a):.4f}"
+        pixel_size = f"{abs(a):.4f}"
         self.pixel_size_summary[pixel_size] += 1
         
         # Quality checks
-        if not src.crs:
-            self.quality_issues.append(f"{filename}: Missing CRS")
+        if not record['crs']:
+            self.quality_issues.add(MISSING_CRS, path, filename)
+        
+        if record['nodata'] is None:
+            self.quality_issues.add(NO_NODATA, path, filename)
         
-        if src.nodata is None:
-            self.quality_issues.append(f"{filename}: No NoData value defined")
+        if 'band_error' in record:
+            self.quality_issues.add(READ_ERROR, path, filename, record['band_error'])
+            return
         
-        # Basic statistics for first band
-        if src.count > 0:
-            self._analyze_band_statistics(src, filename)
+        if record.get('header_only'):
+            self.header_only_files += 1
+            if not self.preliminary:
+                self.quality_issues.add(NOT_ANALYZED, path, filename)
+        
+        for stats in record['bands'] or []:
+            if stats['valid_pixels'] == 0:
+                continue
             
-        # Check file size
-        self._check_file_size(filename, filepath)
-    
-    def _analyze_band_statistics(self, src, filename):
-        """Analyze statistics for the first band of a raster"""
-        band_data = src.read(1, masked=True)
-        if band_data.compressed().size > 0:
-            valid_data = band_data.compressed()
-            stats = {
-                'file': filename,
-                'min': float(np.min(valid_data)),
-                'max': float(np.max(valid_data)),
-                'mean': float(np.mean(valid_data)),
-                'std': float(np.std(valid_data)),
-                'valid_pixels': int(valid_data.size),
-                'total_pixels': int(band_data.size)
-            }
-            self.raster_stats.append(stats)
+            # Per-file histograms are folded into dataset-wide sketches and
+            # dropped, so only each file's percentiles stay in memory
+            histogram = stats.get('histogram') if self.retain_histograms else stats.pop('histogram', None)
+            if histogram:
+                sketch = QuantileSketch.from_dict(histogram)
+                if stats['band'] in self.value_sketches:
+                    self.value_sketches[stats['band']].merge(sketch)
+                else:
+                    self.value_sketches[stats['band']] = sketch
+            if stats['band'] == 1:
+                self.raster_stats.append(stats)
             
             # Check for suspicious values
-            if np.min(valid_data) < -1000 or np.max(valid_data) > 10000:
-                self.quality_issues.append(
-                    f"{filename}: Suspicious data values (min: {np.min(valid_data):.2f}, max: {np.max(valid_data):.2f})"
-                )
+            if stats['min'] < -1000 or stats['max'] > 10000:
+                self.quality_issues.add(SUSPICIOUS_VALUES, path, filename, stats['band'], stats['min'], stats['max'])
+        
+        # Check file size
+        self._check_file_size(path, filename, record['file_size'])
+    
+    def _remove_record(self, record):
+        """Take a file record's contribution back out of the summaries
+
+        The inverse of _fold_record; band histograms must have been retained.
+        """
+        self.quality_issues.remove_file(record['path'])
+        if 'error' in record:
+            return
+        
+        self._discount(self.datum_summary, record['crs'] or 'No CRS')
+        self.total_area -= record['area']
+        self.valid_area -= record['valid_area'] or 0
+        self._discount(self.pixel_size_summary, f"{abs(record['transform'][0]):.4f}")
+        if 'band_error' in record:
+            return
+        
+        if record.get('header_only'):
+            self.header_only_files -= 1
+        
+        for stats in record['bands'] or []:
+            if stats['valid_pixels'] == 0:
+                continue
+            histogram = stats.get('histogram')
+            sketch = self.value_sketches.get(stats['band'])
+            if histogram and sketch:
+                sketch.subtract(QuantileSketch.from_dict(histogram))
+                if not sketch.count:
+                    del self.value_sketches[stats['band']]
+            if stats['band'] == 1:
+                self.raster_stats.remove(stats)
+    
+    @staticmethod
+    def _discount(summary, key):
+        """Decrement a file count, dropping keys no file has any more"""
+        summary[key] -= 1
+        if not summary[key]:
+            del summary[key]
     
-    def _check_file_size(self, filename, filepath):
+    def _check_file_size(self, path, filename, size_bytes):
         """Check for very small or very large files"""
-        file_size = os.path.getsize(filepath) / (1024 * 1024)  # MB
+        file_size = size_bytes / (1024 * 1024)  # MB
         if file_size < 1:
-            self.quality_issues.append(f"{filename}: Very small file size ({file_size:.2f} MB)")
+            self.quality_issues.add(SMALL_FILE, path, filename, file_size)
         elif file_size > 1000:
-            self.quality_issues.append(f"{filename}: Very large file size ({file_size:.2f} MB)")
+            self.quality_issues.add(LARGE_FILE, path, filename, file_size)
+    
+    def _format_issue(self, issue):
+        """Render an issue record as 'file: message'"""
+        return f"{issue.file}: {issue.message()}"
+    
+    def _iter_issues(self):
+        """Quality issues in file order"""
+        for record in self.file_records:
+            yield from self.quality_issues.for_file(record['path'])
     
     def generate_summary_section(self):
         """Generate the overall summary section"""
         self.add_section_header("OVERALL SUMMARY")
         self.add_line(f"Total GeoTIFF files analyzed: {len(self.geotiff_files)}")
         self.add_line(f"Total approximate area covered: {self.total_area/1000000:.2f} km²")
+        self.add_line(f"Area with valid data (band 1): {self.valid_area/1000000:.2f} km²")
         self.add_line(f"Quality issues found: {len(self.quality_issues)}")
-        self.add_line(f"Files with issues: {len(set([issue.split(':')[0] for issue in self.quality_issues]))}")
+        self.add_line(f"Files with issues: {self.quality_issues.files_with_issues}")
+        if self.header_only_files:
+            self.add_line(f"Files not deeply analyzed (header checks only): {self.header_only_files}")
     
     def generate_crs_analysis(self):
         """Generate the CRS/Datum analysis section"""
@@ -192,24 +497,56 @@ class GeoTiffAnalyzer:
             self.add_line(f"Data Value Range Across All Files:")
             self.add_line(f"  Global Minimum: {min(all_mins):.4f}")
             self.add_line(f"  Global Maximum: {max(all_maxs):.4f}")
-            self.add_line(f"  Average of Means: {np.mean(all_means):.4f}")
-            self.add_line(f"  Standard Deviation of Means: {np.std(all_means):.4f}")
+            self.add_line(f"  Average of Means: {statistics.fmean(all_means):.4f}")
+            self.add_line(f"  Standard Deviation of Means: {statistics.pstdev(all_means):.4f}")
+            if 1 in self.value_sketches:
+                self.add_line(f"  Pixel Percentiles (all files): {self._format_percentiles(self.value_sketches[1].percentiles())}")
+            
+            approximate = sum(1 for s in self.raster_stats if s.get('approximate'))
+            if approximate:
+                self.add_line("")
+                self.add_line(f"NOTE: Statistics for {approximate} files are approximate (overview/decimated reads).")
+        
+        # Value ranges of the additional bands of multi-band files
+        extra_bands = defaultdict(list)
+        for record in self.file_records:
+            for stats in (record.get('bands') or [])[1:]:
+                if stats['valid_pixels'] > 0:
+                    extra_bands[stats['band']].append(stats)
+        if extra_bands:
+            self.add_line("")
+            self.add_line("Additional Bands of Multi-Band Files:")
+            for band in sorted(extra_bands):
+                band_stats = extra_bands[band]
+                self.add_line(
+                    f"  Band {band} ({len(band_stats)} files): "
+                    f"min {min(s['min'] for s in band_stats):.4f}, "
+                    f"max {max(s['max'] for s in band_stats):.4f}, "
+                    f"average of means {statistics.fmean(s['mean'] for s in band_stats):.4f}"
+                )
+                if band in self.value_sketches:
+                    self.add_line(f"    Pixel Percentiles: {self._format_percentiles(self.value_sketches[band].percentiles())}")
+    
+    def _format_percentiles(self, percentiles):
+        """Format a {'p1', 'p50', 'p99'} dict for the report"""
+        return (f"p1 {percentiles['p1']:.4f}, p50 {percentiles['p50']:.4f}, p99 {percentiles['p99']:.4f} "
+                f"(within {RELATIVE_ACCURACY:.0%})")
     
     def generate_quality_issues_section(self):
         """Generate the quality issues and recommendations section"""
         self.add_section_header("QUALITY ISSUES AND RECOMMENDATIONS")
         if self.quality_issues:
             self.add_line("Issues found:")
-            for issue in self.quality_issues:
-                self.add_line(f"  • {issue}")
+            for issue in self._iter_issues():
+                self.add_line(f"  • {self._format_issue(issue)}")
             
             self.add_line("")
             self.add_line("Recommendations:")
-            if any("Missing CRS" in issue for issue in self.quality_issues):
+            if self.quality_issues.count(MISSING_CRS):
                 self.add_line("  • Define coordinate reference system for files missing CRS")
-            if any("NoData" in issue for issue in self.quality_issues):
+            if self.quality_issues.count(NO_NODATA):
                 self.add_line("  • Set appropriate NoData values for better data handling")
-            if any("Suspicious data values" in issue for issue in self.quality_issues):
+            if self.quality_issues.count(SUSPICIOUS_VALUES):
                 self.add_line("  • Review data values for potential errors or outliers")
             if len(self.datum_summary) > 1:
                 self.add_line("  • Consider reprojecting all files to a common CRS")
@@ -222,87 +559,101 @@ class GeoTiffAnalyzer:
         """Generate detailed analysis for each file"""
         self.add_section_header("DETAILED FILE ANALYSIS")
         
-        for filename in self.geotiff_files:
-            filepath = os.path.join(self.folder, filename)
-            self.add_line(f"File: {filename}")
-            try:
-                with rasterio.open(filepath) as src:
-                    self._generate_file_details(src, filename, filepath)
-            except Exception as e:
-                self.add_line(f"  Error reading file: {e}")
-            
-            self.add_line("")
+        if self._use_volumes():
+            self._generate_volume_index()
+            return
+        
+        for record in self.file_records:
+            self._generate_file_entry(record)
+    
+    def _generate_volume_index(self):
+        """List the volumes holding the detailed file analysis"""
+        volumes = -(-len(self.file_records) // self.volume_size)
+        self.add_line(f"Per-file details are split into {volumes} volumes of up to {self.volume_size} files:")
+        pdf_path = self.report_path()
+        for number, records in self._iter_volumes():
+            self.add_line(f"  {os.path.basename(self.volume_path(pdf_path, number))}: "
+                          f"{records[0]['file']} ... {records[-1]['file']} ({len(records)} files)")
+    
+    def _generate_file_entry(self, record):
+        """Generate the detailed analysis entry for one file"""
+        self.add_line(f"File: {record['file']}")
+        if 'error' in record:
+            self.add_line(f"  Error reading file: {record['error']}")
+        else:
+            self._generate_file_details(record)
+        
+        self.add_line("")
     
-    def _generate_file_details(self, src, filename, filepath):
+    def _generate_file_details(self, record):
         """Generate detailed information for a single file"""
         # Basic info
-        self.add_line(f"  Dimensions: {src.width} x {src.height} pixels")
-        self.add_line(f"  Bands: {src.count}")
-        self.add_line(f"  Data type: {src.dtypes[0]}")
-        self.add_line(f"  CRS: {src.crs.to_string() if src.crs else 'No CRS'}")
+        self.add_line(f"  Dimensions: {record['width']} x {record['height']} pixels")
+        self.add_line(f"  Bands: {record['count']}")
+        self.add_line(f"  Data type: {record['dtype']}")
+        self.add_line(f"  CRS: {record['crs'] or 'No CRS'}")
         
         # Affine transform and pixel size
-        transform = src.transform
-        self.add_line(f"  Pixel Size: {abs(transform.a):.6f} x {abs(transform.e):.6f} units")
+        a, b, c, d, e, f = record['transform']
+        self.add_line(f"  Pixel Size: {abs(a):.6f} x {abs(e):.6f} units")
         
         # Bounds
-        bounds = src.bounds
+        left, bottom, right, top = record['bounds']
         self.add_line(f"  Bounds:")
-        self.add_line(f"    Left: {bounds.left:.6f}")
-        self.add_line(f"    Bottom: {bounds.bottom:.6f}")
-        self.add_line(f"    Right: {bounds.right:.6f}")
-        self.add_line(f"    Top: {bounds.top:.6f}")
+        self.add_line(f"    Left: {left:.6f}")
+        self.add_line(f"    Bottom: {bottom:.6f}")
+        self.add_line(f"    Right: {right:.6f}")
+        self.add_line(f"    Top: {top:.6f}")
         
         # Coverage area
-        coverage_area = (bounds.right - bounds.left) * (bounds.top - bounds.bottom)
+        coverage_area = (right - left) * (top - bottom)
         self.add_line(f"  Coverage Area: {coverage_area:.2f} square units")
         
         # NoData value
-        nodata = src.nodata
+        nodata = record['nodata']
         self.add_line(f"  NoData Value: {nodata if nodata is not None else 'None'}")
         
         # File size
-        file_size = os.path.getsize(filepath) / (1024 * 1024)
+        file_size = record['file_size'] / (1024 * 1024)
         self.add_line(f"  File Size: {file_size:.2f} MB")
         
         # Band statistics
-        if src.count > 0:
-            self._generate_band_details(src)
+        if 'band_error' in record:
+            self.add_line(f"  Band statistics error: {record['band_error']}")
+        elif record.get('header_only'):
+            self.add_line("  Band statistics: not deeply analyzed")
+        else:
+            for stats in record['bands'] or []:
+                self._generate_band_details(stats)
     
-    def _generate_band_details(self, src):
+    def _generate_band_details(self, stats):
         """Generate detailed band statistics"""
-        try:
-            band_data = src.read(1, masked=True)
-            if band_data.compressed().size > 0:
-                valid_data = band_data.compressed()
-                self.add_line(f"  Band 1 Statistics:")
-                self.add_line(f"    Min: {np.min(valid_data):.4f}")
-                self.add_line(f"    Max: {np.max(valid_data):.4f}")
-                self.add_line(f"    Mean: {np.mean(valid_data):.4f}")
-                self.add_line(f"    Std Dev: {np.std(valid_data):.4f}")
-                self.add_line(f"    Valid Pixels: {valid_data.size:,}")
-                self.add_line(f"    NoData Pixels: {band_data.size - valid_data.size:,}")
-                self.add_line(f"    Data Coverage: {(valid_data.size/band_data.size)*100:.1f}%")
+        band = stats['band']
+        if stats['valid_pixels'] > 0:
+            if stats.get('approximate'):
+                self.add_line(f"  Band {band} Statistics (approximate, 1/{stats['sample_factor']} resolution):")
             else:
-                self.add_line(f"  Band 1: No valid data")
-        except Exception as e:
-            self.add_line(f"  Band statistics error: {str(e)}")
+                self.add_line(f"  Band {band} Statistics:")
+            self.add_line(f"    Min: {stats['min']:.4f}")
+            self.add_line(f"    Max: {stats['max']:.4f}")
+            self.add_line(f"    Mean: {stats['mean']:.4f}")
+            self.add_line(f"    Std Dev: {stats['std']:.4f}")
+            if 'percentiles' in stats:
+                self.add_line(f"    Percentiles: {self._format_percentiles(stats['percentiles'])}")
+            self.add_line(f"    Valid Pixels: {stats['valid_pixels']:,}")
+            self.add_line(f"    NoData Pixels: {stats['total_pixels'] - stats['valid_pixels']:,}")
+            self.add_line(f"    Data Coverage: {(stats['valid_pixels']/stats['total_pixels'])*100:.1f}%")
+        else:
+            self.add_line(f"  Band {band}: No valid data")
     
     def generate_spatial_coverage_analysis(self):
         """Generate spatial coverage analysis section"""
         self.add_section_header("SPATIAL COVERAGE ANALYSIS")
         try:
-            bounds_list = []
-            for filename in self.geotiff_files:
-                filepath = os.path.join(self.folder, filename)
-                try:
-                    with rasterio.open(filepath) as src:
-                        bounds_list.append({
-                            'file': filename,
-                            'bounds': src.bounds
-                        })
-                except:
-                    continue
+            bounds_list = [
+                {'file': record['file'], 'bounds': record['bounds']}
+                for record in self.file_records if 'error' not in record
+            ]
             
             if len(bounds_list) > 1:
                 self._analyze_spatial_extent(bounds_list)
@@ -312,10 +663,10 @@ class GeoTiffAnalyzer:
     def _analyze_spatial_extent(self, bounds_list):
         """Analyze overall spatial extent and overlaps"""
         # Find overall bounding box
-        all_lefts = [b['bounds'].left for b in bounds_list]
-        all_rights = [b['bounds'].right for b in bounds_list]
-        all_bottoms = [b['bounds'].bottom for b in bounds_list]
-        all_tops = [b['bounds'].top for b in bounds_list]
+        all_lefts = [b['bounds'][0] for b in bounds_list]
+        all_bottoms = [b['bounds'][1] for b in bounds_list]
+        all_rights = [b['bounds'][2] for b in bounds_list]
+        all_tops = [b['bounds'][3] for b in bounds_list]
         
         overall_bounds = {
             'left': min(all_lefts),
@@ -333,18 +684,19 @@ class GeoTiffAnalyzer:
         total_extent_area = (overall_bounds['right'] - overall_bounds['left']) * (overall_bounds['top'] - overall_bounds['bottom'])
         self.add_line(f"  Total Extent Area: {total_extent_area:.2f} square units")
         
-        # Check for potential overlaps (simplified)
-        overlap_count = 0
-        for i, bounds1 in enumerate(bounds_list):
-            for j, bounds2 in enumerate(bounds_list[i+1:], i+1):
-                b1, b2 = bounds1['bounds'], bounds2['bounds']
-                if (b1.left < b2.right and b1.right > b2.left and 
-                    b1.bottom < b2.top and b1.top > b2.bottom):
-                    overlap_count += 1
+        # Check for potential overlaps using a bounding-box index
+        overlap_pairs = find_overlapping_pairs([b['bounds'] for b in bounds_list])
+        overlap_count = len(overlap_pairs)
         
         self.add_line(f"  Potential overlapping file pairs: {overlap_count}")
         if overlap_count > 0:
             self.add_line("  Note: Overlaps detected - consider mosaic creation")
+            self.add_line("")
+            self.add_line("Overlapping File Pairs:")
+            for i, j in overlap_pairs[:MAX_LISTED_OVERLAPS]:
+                self.add_line(f"  {bounds_list[i]['file']} <-> {bounds_list[j]['file']}")
+            if overlap_count > MAX_LISTED_OVERLAPS:
+                self.add_line(f"  ... and {overlap_count - MAX_LISTED_OVERLAPS} more pairs")
     
     def generate_recommendations_section(self):
         """Generate processing recommendations section"""
@@ -364,7 +716,7 @@ class GeoTiffAnalyzer:
             self.add_line("   • Use appropriate resampling method (bilinear, cubic, etc.)")
             self.add_line("")
         
-        if any("Missing CRS" in issue for issue in self.quality_issues):
+        if self.quality_issues.count(MISSING_CRS):
             self.add_line("3. MISSING CRS CORRECTION:")
             self.add_line("   • Define appropriate coordinate system for files missing CRS")
             self.add_line("   • Verify spatial alignment after CRS assignment")
@@ -377,65 +729,480 @@ class GeoTiffAnalyzer:
         self.add_line("   • Document all processing steps for reproducibility")
         self.add_line("")
     
+    def generate_diagnostics_appendix(self):
+        """Generate the run diagnostics appendix: phase timings and slowest files"""
+        self.add_section_header("APPENDIX: RUN DIAGNOSTICS")
+        
+        self.add_line("Phase timings (wall / CPU seconds):")
+        for name, totals in self.timer.phases.items():
+            self.add_line(f"  {name}: {totals['wall_s']:.2f} s / {totals['cpu_s']:.2f} s")
+        
+        measured = [record for record in self.file_records if 'diagnostics' in record]
+        # Header-only records left over when the time budget ran out
+        skipped = sum(1 for record in self.file_records if record.get('header_only') and 'diagnostics' not in record)
+        self.add_line("")
+        self.add_line(f"Files analyzed in this run: {len(measured)} "
+                      f"(reused from cache or shard results: {len(self.file_records) - len(measured) - skipped})")
+        if skipped:
+            self.add_line(f"Files not deeply analyzed within the time budget: {skipped}")
+        self.add_line("PDF save time is not included above; see the diagnostics log.")
+        if not measured:
+            return
+        
+        # Worker CPU time is only visible through the per-file figures
+        blocks = sum(record['diagnostics']['blocks_read'] for record in measured)
+        megabytes = sum(record['diagnostics']['bytes_read'] for record in measured) / (1024 * 1024)
+        file_cpu = sum(record['diagnostics']['cpu_s'] for record in measured)
+        self.add_line(f"Blocks read: {blocks} ({megabytes:.1f} MB decoded)")
+        self.add_line(f"CPU time spent in file analysis: {file_cpu:.2f} s")
+        
+        slowest = sorted(measured, key=lambda record: record['diagnostics']['wall_s'], reverse=True)
+        self.add_line("")
+        self.add_line(f"Slowest {min(self.diagnostics, len(slowest))} files (wall s, open s, statistics s, MB read):")
+        for record in slowest[:self.diagnostics]:
+            d = record['diagnostics']
+            self.add_line(f"  {record['file']}: {d['wall_s']:.2f}, {d['open_s']:.2f}, {d['stats_s']:.2f}, "
+                          f"{d['bytes_read'] / (1024 * 1024):.1f}")
+    
+    def export_results(self, base_path, fmt):
+        """Write file records, quality issues and summaries next to base_path
+
+        Returns the paths written. Rows are generated one at a time, so the
+        exporters never hold more than one row (or Parquet row group).
+        """
+        from app.export import (BAND_COLUMNS, FILE_COLUMNS, ISSUE_COLUMNS, SUMMARY_COLUMNS,
+                                band_rows, flatten_record, write_rows)
+        
+        stem = os.path.splitext(base_path)[0]
+        return [
+            write_rows(f"{stem}.files.{fmt}", (flatten_record(r) for r in self.file_records), FILE_COLUMNS, fmt),
+            write_rows(f"{stem}.bands.{fmt}", band_rows(self.file_records), BAND_COLUMNS, fmt),
+            write_rows(f"{stem}.issues.{fmt}", self._issue_rows(), ISSUE_COLUMNS, fmt),
+            write_rows(f"{stem}.summary.{fmt}", self._summary_rows(), SUMMARY_COLUMNS, fmt),
+        ]
+    
+    def _issue_rows(self):
+        """Yield quality issues as export rows"""
+        for issue in self._iter_issues():
+            yield {
+                'file': issue.file,
+                'code': issue.code,
+                'severity': issue.severity,
+                'issue': issue.message(),
+            }
+    
+    def _summary_rows(self):
+        """Yield the aggregate summaries as (metric, key, value) export rows"""
+        yield {'metric': 'files_analyzed', 'key': None, 'value': len(self.geotiff_files)}
+        yield {'metric': 'total_area', 'key': None, 'value': self.total_area}
+        yield {'metric': 'valid_area', 'key': None, 'value': self.valid_area}
+        yield {'metric': 'quality_issues', 'key': None, 'value': len(self.quality_issues)}
+        yield {'metric': 'files_with_issues', 'key': None, 'value': self.quality_issues.files_with_issues}
+        for code, count in self.quality_issues.by_code.items():
+            yield {'metric': 'issue_count', 'key': code, 'value': count}
+        for crs, count in self.datum_summary.items():
+            yield {'metric': 'crs_files', 'key': crs, 'value': count}
+        for pixel_size, count in self.pixel_size_summary.items():
+            yield {'metric': 'pixel_size_files', 'key': pixel_size, 'value': count}
+        if self.raster_stats:
+            all_means = [s['mean'] for s in self.raster_stats]
+            yield {'metric': 'global_min', 'key': None, 'value': min(s['min'] for s in self.raster_stats)}
+            yield {'metric': 'global_max', 'key': None, 'value': max(s['max'] for s in self.raster_stats)}
+            yield {'metric': 'mean_of_means', 'key': None, 'value': statistics.fmean(all_means)}
+            yield {'metric': 'std_of_means', 'key': None, 'value': statistics.pstdev(all_means)}
+        for band in sorted(self.value_sketches):
+            for name, value in self.value_sketches[band].percentiles().items():
+                yield {'metric': f'band_{band}_{name}', 'key': None, 'value': value}
+    
     def generate_report(self):
         """Generate the complete PDF report"""
-        if not self.folder or not self.geotiff_files:
-            print("No folder selected or no GeoTIFF files found.")
+        if not self.folder:
+            print("No folder selected.")
+            return None
+        
+        # Header checks first, reported before any pixel is read
+        if self.triage:
+            # One process pool serves both the header and the pixel pass
+            if self.workers > 1 and self.executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts)
+            try:
+                self.triage_files()
+                if not self.geotiff_files:
+                    print("No GeoTIFF files found.")
+                    return None
+                
+                path = self.write_report(self.preliminary_path())
+                print(f"Preliminary report generated: {path}")
+                self.analyze_files()
+            finally:
+                if self.executor:
+                    self.executor.shutdown(cancel_futures=True)
+                    self.executor = None
+        else:
+            # Analyze files first so discovery streams straight into analysis
+            self.analyze_files()
+        if not self.geotiff_files:
+            print("No GeoTIFF files found.")
             return None
         
+        return self.write_report()
+    
+    def watch(self, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        """Keep the report up to date while GeoTIFFs are added, changed or removed
+
+        Runs until interrupted and returns the last report path. New files are
+        analyzed in a process pool kept warm for the whole session and folded
+        into the summaries as they arrive; the old records of changed or
+        removed files are subtracted from them, without re-reading any other
+        file. The report is rewritten once no change has been seen for
+        debounce seconds.
+        """
+        self.retain_histograms = True
+        watcher = FolderWatcher(self.roots or [self.folder], self.recursive, self.include, self.exclude)
+        watcher.prime()
+        
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts)
+        
+        pdf_path = None
+        cache = None
+        last_change = None
+        try:
+            self.analyze_files()
+            if self.file_records:
+                pdf_path = self.write_report()
+                print(f"Quality Report generated: {pdf_path}")
+            
+            cache = self._open_cache()
+            print(f"Watching for changes every {interval:g} s (Ctrl+C to stop)...")
+            while True:
+                time.sleep(interval)
+                changed, removed = watcher.scan()
+                if changed or removed:
+                    self._apply_changes(changed, removed, cache)
+                    last_change = time.monotonic()
+                    print(f"{len(changed)} files new or changed, {len(removed)} removed; "
+                          f"{len(self.file_records)} files in report")
+                
+                if last_change is not None and time.monotonic() - last_change >= debounce:
+                    pdf_path = self.write_report()
+                    last_change = None
+                    print(f"Quality Report updated: {pdf_path}")
+        except KeyboardInterrupt:
+            if last_change is not None:
+                pdf_path = self.write_report()
+                print(f"Quality Report updated: {pdf_path}")
+        finally:
+            if cache:
+                cache.close()
+            if self.executor:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+        
+        return pdf_path
+    
+    def _apply_changes(self, changed, removed, cache):
+        """Analyze new or changed files and update the summaries
+
+        The summaries are updated in place: the old records of changed and
+        removed files are subtracted and their new records folded in, so
+        nothing else is re-folded.
+        """
+        fresh = {record['path']: record for record in self._analyze_records(changed, cache)}
+        if cache:
+            cache.commit()
+        
+        removed = set(removed)
+        kept = []
+        for record in self.file_records:
+            path = record['path']
+            if path in removed or path in fresh:
+                self._remove_record(record)
+                if path in removed:
+                    continue
+                record = fresh.pop(path)
+                self._fold_record(record)
+            kept.append(record)
+        self.file_records = kept
+        self.geotiff_files = [record['file'] for record in kept]
+        
+        # Files not seen before go at the end
+        for record in fresh.values():
+            self.geotiff_files.append(record['file'])
+            self._add_record(record)
+    
+    def generate_partial(self):
+        """Analyze this node's shard and write its partial result file"""
+        # Histograms travel with the records so the merge can rebuild sketches
+        self.retain_histograms = True
+        self.analyze_files()
+        
+        index, count = self.shard
+        path = f"{os.path.splitext(self.report_path())[0]}.shard-{index}-of-{count}{PARTIAL_SUFFIX}"
+        header = {
+            'version': f"{ANALYZER_VERSION}:approx={self.approx_pixels}",
+            'shard': [index, count],
+            'roots': self.roots or [self.folder],
+        }
+        return write_partial(path, header, self.file_records, self.job_order)
+    
+    def merge_partials(self, paths):
+        """Fold the records of shard partial results as a single run would
+
+        Records are restored to the unsharded discovery order by streaming
+        the partials side by side, so summaries and the report match a
+        single-node run over the same folders without loading every partial
+        first. Returns the shards' combined aggregates.
+        """
+        headers = [read_partial_header(path) for path in paths]
+        missing = check_shards(headers)
+        if missing:
+            count = headers[0]['shard'][1]
+            print(f"Warning: shards {', '.join(f'{index}/{count}' for index in missing)} are missing")
+        aggregates = merge_aggregates(header['aggregates'] for header in headers)
+        
+        self.roots = headers[0]['roots']
+        self.retain_histograms = False
+        self._reset_summaries()
+        self.geotiff_files = []
+        
+        def merged_records():
+            last_seq = -1
+            entries = heapq.merge(*(iter_partial(path) for path in paths), key=lambda entry: entry[0])
+            for seq, record in entries:
+                if seq <= last_seq:
+                    raise ValueError("Partial result records are out of order or repeated")
+                last_seq = seq
+                # The shard node's timings do not describe this run
+                record.pop('diagnostics', None)
+                yield record
+                # Folded once the aggregates have seen the record, since
+                # folding drops its histograms
+                self.geotiff_files.append(record['file'])
+                self._add_record(record)
+        
+        # The shards' own aggregates (moment sums and histograms included)
+        # must agree with the records read back, or a partial was damaged
+        if not aggregates_match(shard_aggregates(merged_records()), aggregates):
+            raise ValueError("Partial result records do not match their aggregates")
+        return aggregates
+    
+    def preliminary_path(self):
+        """Path of the header-only preliminary report"""
+        return f"{os.path.splitext(self.report_path())[0]}.preliminary.pdf"
+    
+    def write_report(self, path=None):
+        """Render the PDF report from the analyzed file records"""
         # Setup PDF
-        pdf_path = self.setup_pdf()
+        pdf_path = self.setup_pdf(path)
         
         # Title
         self.text.setFont("Helvetica-Bold", 16)
         self.add_line("GeoTIFF Quality Report")
+        if self.preliminary:
+            self.text.setFont("Helvetica", 10)
+            self.add_line("Preliminary report: header checks only, pixel statistics pending")
         
         # Switch back to normal font
         self.text.setFont("Helvetica", 10)
         self.add_line("")
-        self.add_line(f"Folder: {self.folder}")
+        self.add_line(f"Folder: {'; '.join(self.roots) if self.roots else self.folder}")
         self.add_line(f"Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.add_line(f"Total files found: {len(self.geotiff_files)}")
         self.add_line("")
         
-        # Analyze files
-        self.analyze_files()
-        
         # Generate all sections
-        self.generate_summary_section()
-        self.generate_crs_analysis()
-        self.generate_pixel_size_analysis()
-        self.generate_statistical_analysis()
-        self.generate_quality_issues_section()
-        self.generate_detailed_file_analysis()
-        self.generate_spatial_coverage_analysis()
-        self.generate_recommendations_section()
+        sections = [
+            self.generate_summary_section,
+            self.generate_crs_analysis,
+            self.generate_pixel_size_analysis,
+            self.generate_statistical_analysis,
+            self.generate_quality_issues_section,
+            self.generate_detailed_file_analysis,
+            self.generate_spatial_coverage_analysis,
+            self.generate_recommendations_section,
+        ]
+        for section in sections:
+            with self.timer.phase(section.__name__):
+                section()
+        
+        if self.diagnostics is not None:
+            self.generate_diagnostics_appendix()
         
         # Finalize PDF
         self.canvas.drawText(self.text)
-        self.canvas.save()
+        with self.timer.phase('canvas.save'):
+            self.canvas.save()
+        
+        if self._use_volumes():
+            with self.timer.phase('write_volumes'):
+                self.write_volumes(pdf_path)
         
         return pdf_path
+    
+    def write_volumes(self, pdf_path):
+        """Render the detailed file analysis as separate PDF volumes
+
+        Each volume is a canvas of its own that is saved before the next
+        one starts, so rendering memory is bounded by the volume size.
+        """
+        self.volume_paths = []
+        volumes = -(-len(self.file_records) // self.volume_size)
+        for number, records in self._iter_volumes():
+            path = self.setup_pdf(self.volume_path(pdf_path, number))
+            
+            self.text.setFont("Helvetica-Bold", 16)
+            self.add_line("GeoTIFF Quality Report")
+            self.text.setFont("Helvetica", 10)
+            self.add_line("")
+            self.add_line(f"Detailed file analysis, volume {number} of {volumes}")
+            self.add_line(f"Main report: {os.path.basename(pdf_path)}")
+            self.add_line("")
+            
+            self.add_section_header("DETAILED FILE ANALYSIS")
+            for record in records:
+                self._generate_file_entry(record)
+            
+            self.canvas.drawText(self.text)
+            self.canvas.save()
+            self.volume_paths.append(path)
+
 
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Generate a quality report for a folder of GeoTIFF files.")
+    parser.add_argument('inputs', nargs='*',
+                        help="folders to scan; a folder dialog is shown when omitted. Files are streamed "
+                             f"in name order, in sorted runs of {SORT_RUN_SIZE} entries for very large folders")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help="scan sub-folders as well")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="only analyze files matching this glob (repeatable)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip files and folders matching this glob (repeatable)")
+    parser.add_argument('-o', '--output', metavar='PDF',
+                        help="report path (default: Quality-Report-<timestamp>.pdf in the first folder)")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="worker processes for file analysis (0 = all cores)")
+    parser.add_argument('--approx-pixels', type=int, metavar='N',
+                        help="estimate band statistics from at most N pixels per file")
+    parser.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH_DEPTH, metavar='DEPTH',
+                        help="blocks read ahead while the current block is reduced (0 = off)")
+    parser.add_argument('--export', action='append', default=[], choices=EXPORT_FORMATS,
+                        help="also write records, issues and summaries in this format next to the report (repeatable)")
+    parser.add_argument('--diagnostics', type=int, nargs='?', const=DIAGNOSTICS_SLOWEST, metavar='N',
+                        help="write a JSON Lines timing log next to the report and append a run diagnostics "
+                             f"section listing the N slowest files (default: {DIAGNOSTICS_SLOWEST})")
+    parser.add_argument('--volume-size', type=int, metavar='N',
+                        help="write the detailed file analysis to separate PDF volumes of N files each")
+    parser.add_argument('--triage', action='store_true',
+                        help="write a preliminary header-only report before computing pixel statistics")
+    parser.add_argument('--priority', choices=PRIORITIES, default='input',
+                        help="order of the pixel statistics pass after triage: input order, files with "
+                             "header issues first, or largest files first (implies --triage)")
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help="stop starting pixel statistics after this many seconds; remaining files are "
+                             "reported as not deeply analyzed (implies --triage)")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and update the report as files are added, changed or removed")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help=f"seconds between folder scans in watch mode (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                        help="seconds without changes before the report is regenerated in watch mode "
+                             f"(default: {DEFAULT_DEBOUNCE:g})")
+    parser.add_argument('--shard', type=parse_shard, metavar='INDEX/COUNT',
+                        help="analyze only this node's share of the files (0-based INDEX of COUNT) and write "
+                             "a partial result file instead of a report")
+    parser.add_argument('--merge', nargs='+', metavar='PARTIAL',
+                        help="build the report from the partial result files of a sharded run")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="do not read or write the result cache")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="invalidate all cached results before analyzing")
+    return parser.parse_args(argv)
 
-def main():
+
+def main(argv=None):
     """Main function to run the GeoTIFF analyzer"""
-    analyzer = GeoTiffAnalyzer()
+    args = parse_args(argv)
+    analyzer = GeoTiffAnalyzer(workers=args.workers, approx_pixels=args.approx_pixels,
+                               prefetch_depth=args.prefetch, diagnostics=args.diagnostics,
+                               volume_size=args.volume_size, triage=args.triage, priority=args.priority,
+                               time_budget=args.time_budget)
     
-    # Select folder
-    if not analyzer.select_folder():
+    if args.merge:
+        # Partial results hold everything the report needs; nothing is scanned
+        analyzer.folder = os.path.dirname(os.path.abspath(args.merge[0]))
+    elif args.inputs:
+        analyzer.roots = args.inputs
+        analyzer.folder = args.inputs[0]
+    elif not analyzer.select_folder():
+        # Select folder
         print("No folder selected. Exiting.")
         return
     
-    if not analyzer.geotiff_files:
-        print("No GeoTIFF files found in the selected folder.")
-        return
+    analyzer.recursive = args.recursive
+    analyzer.include = args.include
+    analyzer.exclude = args.exclude
+    analyzer.output_path = args.output
+    analyzer.shard = args.shard
+    
+    # Fail before analyzing rather than when the report is saved
+    output_dir = os.path.dirname(os.path.abspath(analyzer.report_path()))
+    if not os.path.isdir(output_dir):
+        raise SystemExit(f"Output folder does not exist: {output_dir}")
+    
+    # Reuse results for files unchanged since the previous report
+    if not args.no_cache and not args.merge:
+        report_dir = os.path.dirname(os.path.abspath(args.output)) if args.output else analyzer.folder
+        analyzer.cache_path = os.path.join(report_dir, CACHE_FILENAME)
+        if args.clear_cache:
+            with ResultCache(analyzer.cache_path, None) as cache:
+                cache.clear()
+    
+    # Structured timing log next to the report
+    log_handler = None
+    if args.diagnostics is not None:
+        log_path = os.path.splitext(analyzer.report_path())[0] + ".diagnostics.jsonl"
+        log_handler = open_diagnostics_log(log_path)
+        print(f"Diagnostics log: {log_path}")
     
     # Generate report
-    pdf_path = analyzer.generate_report()
+    try:
+        if args.merge:
+            try:
+                analyzer.merge_partials(args.merge)
+            except ValueError as e:
+                raise SystemExit(f"Cannot merge partial results: {e}")
+            pdf_path = analyzer.write_report()
+        elif args.shard:
+            partial_path = analyzer.generate_partial()
+        elif args.watch:
+            pdf_path = analyzer.watch(args.poll_interval, args.debounce)
+        else:
+            pdf_path = analyzer.generate_report()
+    finally:
+        if log_handler:
+            close_diagnostics_log(log_handler)
+    
+    if args.shard:
+        print(f"Partial result written: {partial_path}")
+        print(f"Files analyzed in shard {args.shard[0]}/{args.shard[1]}: {len(analyzer.geotiff_files)}")
+        return
     
     if pdf_path:
         print(f"Quality Report generated: {pdf_path}")
+        if args.diagnostics is not None:
+            save = analyzer.timer.phases.get('canvas.save')
+            if save:
+                print(f"PDF save time: {save['wall_s']:.2f} s")
+        for path in analyzer.volume_paths:
+            print(f"Detail volume: {path}")
+        for fmt in args.export:
+            for path in analyzer.export_results(pdf_path, fmt):
+                print(f"Exported: {path}")
         print(f"Total files analyzed: {len(analyzer.geotiff_files)}")
         print(f"Quality issues found: {len(analyzer.quality_issues)}")
     else:
@@ -443,4 +1210,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,93 @@
+"""
+GeoTIFF Quality Report Generator
+Ground area of raster footprints
+"""
+
+import math
+import re
+
+import numpy as np
+from rasterio.errors import CRSError
+
+
+# WGS 84 semi-major axis (m) and inverse flattening, used when a geographic
+# CRS does not state its ellipsoid
+WGS84 = (6378137.0, 298.257223563)
+
+_ELLIPSOID = re.compile(r'(?:SPHEROID|ELLIPSOID)\["[^"]*",\s*([0-9.eE+-]+),\s*([0-9.eE+-]+)')
+
+
+def crs_ellipsoid(crs):
+    """(semi-major axis in metres, inverse flattening) of a geographic CRS"""
+    match = _ELLIPSOID.search(crs.to_wkt())
+    if not match:
+        return WGS84
+    return float(match.group(1)), float(match.group(2))
+
+
+def _authalic(phi, eccentricity):
+    """Integral of the ellipsoidal area element over latitude, up to a constant"""
+    sin_phi = np.sin(phi)
+    if eccentricity == 0:
+        return 2 * sin_phi
+    e_sin = eccentricity * sin_phi
+    return sin_phi / (1 - e_sin * e_sin) + np.log((1 + e_sin) / (1 - e_sin)) / (2 * eccentricity)
+
+
+def _zone_areas(ellipsoid, edges, angle_unit):
+    """Ground area in m² per unit of longitude between consecutive latitude edges
+
+    edges are in the CRS angular unit and are clipped to the poles.
+    """
+    semi_major, inverse_flattening = ellipsoid
+    flattening = 1 / inverse_flattening if inverse_flattening else 0.0
+    e2 = flattening * (2 - flattening)
+
+    pole = math.pi / 2 / angle_unit
+    edges = np.clip(edges, -pole, pole) * angle_unit
+    band = np.abs(np.diff(_authalic(edges, math.sqrt(e2))))
+    return semi_major * semi_major * (1 - e2) / 2 * band * angle_unit
+
+
+def row_cell_areas(ellipsoid, top, pixel_height, rows, angle_unit=math.pi / 180):
+    """Ground area in m² of one cell per unit of longitude, for each row
+
+    Rows start at latitude top and step by pixel_height (negative for
+    north-up rasters), both in the CRS angular unit.
+    """
+    return _zone_areas(ellipsoid, top + pixel_height * np.arange(rows + 1), angle_unit)
+
+
+def footprint_area(crs, transform, width, height):
+    """Ground area in m² covered by a raster's pixel grid
+
+    Geographic rasters are integrated in closed form on the CRS ellipsoid
+    between their top and bottom latitudes; projected rasters use the pixel
+    size scaled to metres. Without a CRS the pixel size is taken to be in
+    metres.
+    """
+    a, b, c, d, e, f = transform
+    if crs is None:
+        return abs(a * e) * width * height
+    if crs.is_geographic:
+        _, angle_unit = crs.units_factor
+        zone = _zone_areas(crs_ellipsoid(crs), np.array([f, f + e * height]), angle_unit)
+        return float(zone[0]) * abs(a) * width
+    try:
+        _, metres = crs.linear_units_factor
+    except CRSError:
+        metres = 1.0
+    return abs(a * e) * width * height * metres * metres
+
+
+def valid_footprint_area(crs, transform, row_valid):
+    """Ground area in m² of a geographic raster's valid pixels
+
+    row_valid holds the number of valid pixels in each row, top to bottom,
+    so NoData concentrated towards the poles or the equator is weighted by
+    the actual area of the rows it falls in.
+    """
+    a, b, c, d, e, f = transform
+    _, angle_unit = crs.units_factor
+    areas = row_cell_areas(crs_ellipsoid(crs), f, e, len(row_valid), angle_unit)
+    return float(np.dot(areas, row_valid)) * abs(a)
@@ -0,0 +1,122 @@
+"""
+GeoTIFF Quality Report Generator
+Persistent per-file result cache
+"""
+
+import json
+import os
+import sqlite3
+
+
+# Bump whenever the file record layout or the way it is computed changes,
+# so cached records from older versions are re-analyzed. Kept here rather
+# than in app.analysis so that checking the cache never imports rasterio
+ANALYZER_VERSION = "5"
+
+# Default cache file name, stored next to the report
+CACHE_FILENAME = ".geotiff-quality-cache.sqlite"
+
+# Pending writes are committed in batches of this many records
+COMMIT_INTERVAL = 500
+
+
+class ResultCache:
+    """SQLite cache of file records keyed on path, size, mtime and analyzer version
+
+    A record is only reused when the file's size and modification time and
+    the analyzer version string all match what was stored with it.
+    """
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._uncommitted = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " version TEXT NOT NULL,"
+            " record TEXT NOT NULL)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _key(filepath):
+        """Return the (absolute path, size, mtime_ns) cache key of a file"""
+        stat = os.stat(filepath)
+        return os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns
+
+    def lookup(self, filepath):
+        """Return (record or None, key) for a file
+
+        The key must be passed back to store() so a file modified while it
+        is being analyzed is not cached under its new size and mtime.
+        """
+        try:
+            key = self._key(filepath)
+        except OSError:
+            self.misses += 1
+            return None, None
+
+        row = self.connection.execute(
+            "SELECT record FROM records WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+            (*key, self.version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None, key
+
+        self.hits += 1
+        return json.loads(row[0]), key
+
+    def store(self, key, record):
+        """Store a record under a key returned by lookup()"""
+        # Read failures may be transient (e.g. network shares), so only
+        # successful analyses are cached; band_error marks a pixel read that
+        # failed after the header was read
+        if key is None or 'error' in record or 'band_error' in record:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO records (path, size, mtime_ns, version, record) VALUES (?, ?, ?, ?, ?)",
+            (*key, self.version, json.dumps(record))
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_INTERVAL:
+            self.commit()
+
+    def prune(self, keep_paths=()):
+        """Drop records of files that no longer exist; returns the number removed"""
+        keep = {os.path.abspath(p) for p in keep_paths}
+        stale = [
+            (path,) for (path,) in self.connection.execute("SELECT path FROM records")
+            if path not in keep and not os.path.exists(path)
+        ]
+        self.connection.executemany("DELETE FROM records WHERE path = ?", stale)
+        self.commit()
+        return len(stale)
+
+    def clear(self):
+        """Invalidate every cached record"""
+        self.connection.execute("DELETE FROM records")
+        self.commit()
+
+    def commit(self):
+        """Flush pending writes to disk"""
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """Commit pending writes and close the database"""
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
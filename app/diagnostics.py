@@ -0,0 +1,55 @@
+"""
+GeoTIFF Quality Report Generator
+Run instrumentation: phase timings and structured diagnostics log
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+
+logger = logging.getLogger("geotiff_quality.diagnostics")
+
+
+def log_event(event, **fields):
+    """Write one structured diagnostics event as a JSON log message"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({'event': event, **fields}))
+
+
+def open_diagnostics_log(path):
+    """Send diagnostics events to a JSON Lines file; returns the handler"""
+    handler = logging.FileHandler(path, mode='w', encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+def close_diagnostics_log(handler):
+    """Detach and close a handler returned by open_diagnostics_log"""
+    logger.removeHandler(handler)
+    handler.close()
+
+
+class PhaseTimer:
+    """Accumulates wall and CPU time per named phase of a run"""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block under name; repeated phases accumulate"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.phases.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'calls': 0})
+            totals['wall_s'] += time.perf_counter() - wall
+            totals['cpu_s'] += time.process_time() - cpu
+            totals['calls'] += 1
+            log_event('phase', name=name, **totals)
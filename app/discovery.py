@@ -0,0 +1,79 @@
+"""
+GeoTIFF Quality Report Generator
+Streaming GeoTIFF discovery
+"""
+
+import os
+from fnmatch import fnmatch
+from itertools import islice
+
+
+GEOTIFF_EXTENSIONS = ('.tif', '.tiff')
+
+# Directory entries read and sorted at a time; larger folders are streamed
+# in sorted runs of this many entries
+SORT_RUN_SIZE = 10000
+
+
+def _matches(relpath, name, patterns):
+    """True when a glob matches either the relative path or the bare name"""
+    relpath = relpath.replace(os.sep, '/')
+    return any(fnmatch(relpath, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+
+def iter_geotiffs(roots, recursive=False, include=(), exclude=()):
+    """Yield (name, path) for every GeoTIFF under the given root folders
+
+    Directories are listed with os.scandir one at a time, so callers can
+    start working on the first files before the whole tree has been walked.
+    Entries are visited in name order to keep runs reproducible; a folder
+    with more than SORT_RUN_SIZE entries is read in runs of that many, each
+    sorted and yielded before the next is read, so even a flat folder with
+    millions of files streams with bounded memory. Names are
+    relative to their root when a single root is scanned and full paths
+    otherwise. Include globs restrict the files yielded; exclude globs drop
+    files and prune whole directories.
+    """
+    for name, path, _ in iter_geotiff_entries(roots, recursive, include, exclude):
+        yield name, path
+
+
+def iter_geotiff_entries(roots, recursive=False, include=(), exclude=()):
+    """Like iter_geotiffs, but yield (name, path, relpath) with the path
+    relative to its root, which is the same on every machine"""
+    for root in roots:
+        for path, relpath in _walk(root, '', recursive, include, exclude):
+            yield (relpath if len(roots) == 1 else path), path, relpath
+
+
+def _walk(folder, prefix, recursive, include, exclude):
+    """Depth-first scandir walk of one folder"""
+    try:
+        it = os.scandir(folder)
+    except OSError as e:
+        print(f"Skipping {folder}: {e}")
+        return
+
+    with it:
+        while True:
+            try:
+                entries = sorted(islice(it, SORT_RUN_SIZE), key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"Skipping the rest of {folder}: {e}")
+                return
+            if not entries:
+                return
+
+            for entry in entries:
+                relpath = os.path.join(prefix, entry.name) if prefix else entry.name
+                if exclude and _matches(relpath, entry.name, exclude):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            yield from _walk(entry.path, relpath, recursive, include, exclude)
+                    elif entry.name.lower().endswith(GEOTIFF_EXTENSIONS) and entry.is_file():
+                        if not include or _matches(relpath, entry.name, include):
+                            yield entry.path, relpath
+                except OSError:
+                    continue
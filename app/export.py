@@ -0,0 +1,218 @@
+"""
+GeoTIFF Quality Report Generator
+Machine-readable JSON Lines / CSV / Parquet exports
+"""
+
+import csv
+import json
+import math
+
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_ROWS = 10000
+
+# (column, type) layouts of the exported tables
+FILE_COLUMNS = [
+    ('file', 'string'),
+    ('path', 'string'),
+    ('width', 'int'),
+    ('height', 'int'),
+    ('count', 'int'),
+    ('dtype', 'string'),
+    ('crs', 'string'),
+    ('pixel_size_x', 'float'),
+    ('pixel_size_y', 'float'),
+    ('left', 'float'),
+    ('bottom', 'float'),
+    ('right', 'float'),
+    ('top', 'float'),
+    ('nodata', 'float'),
+    ('file_size', 'int'),
+    ('area', 'float'),
+    ('valid_area', 'float'),
+    ('valid_pixels', 'int'),
+    ('total_pixels', 'int'),
+    ('min', 'float'),
+    ('max', 'float'),
+    ('mean', 'float'),
+    ('std', 'float'),
+    ('p1', 'float'),
+    ('p50', 'float'),
+    ('p99', 'float'),
+    ('approximate', 'bool'),
+    ('error', 'string'),
+]
+
+BAND_COLUMNS = [
+    ('file', 'string'),
+    ('band', 'int'),
+    ('valid_pixels', 'int'),
+    ('total_pixels', 'int'),
+    ('min', 'float'),
+    ('max', 'float'),
+    ('mean', 'float'),
+    ('std', 'float'),
+    ('p1', 'float'),
+    ('p50', 'float'),
+    ('p99', 'float'),
+    ('approximate', 'bool'),
+]
+
+ISSUE_COLUMNS = [
+    ('file', 'string'),
+    ('code', 'string'),
+    ('severity', 'string'),
+    ('issue', 'string'),
+]
+
+SUMMARY_COLUMNS = [
+    ('metric', 'string'),
+    ('key', 'string'),
+    ('value', 'float'),
+]
+
+
+def flatten_record(record):
+    """Flatten a file record into a FILE_COLUMNS row"""
+    row = dict.fromkeys(name for name, _ in FILE_COLUMNS)
+    row.update({'file': record['file'], 'path': record['path'], 'error': record.get('error') or record.get('band_error')})
+    if 'error' in record:
+        return row
+
+    a, b, c, d, e, f = record['transform']
+    left, bottom, right, top = record['bounds']
+    row.update({
+        'width': record['width'],
+        'height': record['height'],
+        'count': record['count'],
+        'dtype': record['dtype'],
+        'crs': record['crs'],
+        'pixel_size_x': abs(a),
+        'pixel_size_y': abs(e),
+        'left': left,
+        'bottom': bottom,
+        'right': right,
+        'top': top,
+        'nodata': record['nodata'],
+        'file_size': record['file_size'],
+        'area': record['area'],
+        'valid_area': record['valid_area'],
+    })
+
+    # Band 1 is flattened into the file table; see band_rows for the rest
+    stats = (record.get('bands') or [None])[0]
+    if stats:
+        row.update({
+            'valid_pixels': stats['valid_pixels'],
+            'total_pixels': stats['total_pixels'],
+            'min': stats.get('min'),
+            'max': stats.get('max'),
+            'mean': stats.get('mean'),
+            'std': stats.get('std'),
+            'approximate': bool(stats.get('approximate')),
+        })
+        row.update(stats.get('percentiles') or {})
+    return row
+
+
+def band_rows(records):
+    """Yield one BAND_COLUMNS row per band of every record"""
+    for record in records:
+        for stats in record.get('bands') or []:
+            yield {
+                'file': record['file'],
+                'band': stats['band'],
+                'valid_pixels': stats['valid_pixels'],
+                'total_pixels': stats['total_pixels'],
+                'min': stats.get('min'),
+                'max': stats.get('max'),
+                'mean': stats.get('mean'),
+                'std': stats.get('std'),
+                'approximate': bool(stats.get('approximate')),
+                **(stats.get('percentiles') or {}),
+            }
+
+
+class JsonLinesWriter:
+    """Write rows as one JSON object per line"""
+
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        # NaN and infinity (e.g. a NaN NoData value) are not valid JSON
+        row = {key: None if isinstance(value, float) and not math.isfinite(value) else value
+               for key, value in row.items()}
+        self.file.write(json.dumps(row, allow_nan=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    """Write rows as CSV with a header line"""
+
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=[name for name, _ in columns])
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Write rows as Parquet, flushing one row group per PARQUET_BATCH_ROWS rows"""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+        self.pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch = []
+
+    def write(self, row):
+        self.batch.append(row)
+        if len(self.batch) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self.batch:
+            self.writer.write_table(self.pa.Table.from_pylist(self.batch, schema=self.schema))
+            self.batch = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+WRITERS = {
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def write_rows(path, rows, columns, fmt):
+    """Stream rows from an iterable into a file of the given format"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    writer = WRITERS[fmt](path, columns)
+    try:
+        for row in rows:
+            writer.write(row)
+    finally:
+        writer.close()
+    return path
@@ -0,0 +1,326 @@
+"""
+GeoTIFF Quality Report Generator
+Ground control point accuracy checks (RMSE) without ArcGIS
+
+    python -m app.gcp planimetric TARGETS GCPS OUTPUT_FOLDER
+    python -m app.gcp height ELEVATION_RASTER GCPS HEIGHT_FIELD OUTPUT_FOLDER
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from app.vectors import read_points, transform_points, utm_crs
+
+
+# Targets further than this from every GCP are left out of the planimetric RMSE
+MAX_GCP_DISTANCE = 5.0
+
+REPORT_FILENAME = "report.csv"
+
+
+class PointGrid:
+    """Uniform grid over an (n, 2) point array for fixed-radius nearest queries
+
+    Points are bucketed into square cells of side cell_size and sorted by
+    cell, so a query only compares against the 3x3 cells around it. All
+    queries are answered together with NumPy, without a Python loop per point.
+    """
+
+    def __init__(self, points, cell_size):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.cell_size = float(cell_size)
+
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0) - 1 if len(cells) else np.zeros(2, dtype=np.int64)
+        self.shape = cells.max(axis=0) - self.origin + 2 if len(cells) else np.ones(2, dtype=np.int64)
+
+        # Point positions ordered by cell key, and the extent of each occupied cell
+        keys = self._keys(cells)
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _keys(self, cells):
+        """Linear cell keys, clamping cells outside the grid to its one-cell border"""
+        column = np.clip(cells[:, 0] - self.origin[0], 0, self.shape[0])
+        row = np.clip(cells[:, 1] - self.origin[1], 0, self.shape[1])
+        return column * (self.shape[1] + 1) + row
+
+    def nearest_within(self, queries, max_distance):
+        """Nearest indexed point to every query point, if within max_distance
+
+        Returns (indices, distances): indices is -1 where no point is within
+        max_distance (which must not exceed cell_size) and distances is inf
+        there. Ties go to the point that comes first in the indexed array.
+        """
+        if max_distance > self.cell_size:
+            raise ValueError("max_distance must not exceed the grid cell size")
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        distances = np.full(len(queries), np.inf)
+        if not len(queries) or not len(self.points):
+            return indices, distances
+
+        # Candidate ranges: the occupied cells among each query's 3x3 neighbourhood
+        cells = np.floor(queries / self.cell_size).astype(np.int64)
+        query_ids = []
+        starts = []
+        counts = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = self._keys(cells + (dx, dy))
+                slot = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+                hit = self.cell_keys[slot] == keys
+                query_ids.append(np.nonzero(hit)[0])
+                starts.append(self.cell_starts[slot[hit]])
+                counts.append(self.cell_counts[slot[hit]])
+        query_ids = np.concatenate(query_ids)
+        starts = np.concatenate(starts)
+        counts = np.concatenate(counts)
+
+        # Expand the ranges into one (query, point) pair per candidate
+        candidate_queries = np.repeat(query_ids, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidate_points = self.order[np.repeat(starts, counts) + offsets]
+
+        delta = queries[candidate_queries] - self.points[candidate_points]
+        candidate_distances = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+        close = candidate_distances <= max_distance
+        candidate_queries = candidate_queries[close]
+        candidate_points = candidate_points[close]
+        candidate_distances = candidate_distances[close]
+
+        # First pair per query after sorting by query, distance, point index
+        ranked = np.lexsort((candidate_points, candidate_distances, candidate_queries))
+        found, first = np.unique(candidate_queries[ranked], return_index=True)
+        indices[found] = candidate_points[ranked[first]]
+        distances[found] = candidate_distances[ranked[first]]
+        return indices, distances
+
+
+def _projected(xy, crs, name):
+    """Reproject geographic points to the UTM zone at their centre"""
+    if crs is not None and crs.is_geographic and len(xy):
+        print(f"Reprojecting {name} layer to UTM...")
+        utm = utm_crs(xy, crs)
+        return transform_points(xy, crs, utm), utm
+    return xy, crs
+
+
+def planimetric_rmse(targets, gcps, max_distance=MAX_GCP_DISTANCE):
+    """Match every target point to its nearest GCP and compute the easting/northing RMSE
+
+    targets and gcps are read_points() results. Returns (rows, rmse_easting,
+    rmse_northing): one row per target with a GCP within max_distance, as
+    (target_id, target_x, target_y, gcp_x, gcp_y, diff_x, diff_y, distance),
+    and None for the RMSEs when no target matched. Geographic layers are
+    reprojected to UTM and the GCPs to the target CRS first, so distances
+    are in metres.
+    """
+    target_ids, target_xy, target_crs = targets[0], targets[1], targets[2]
+    gcp_xy, gcp_crs = gcps[1], gcps[2]
+
+    target_xy, target_crs = _projected(target_xy, target_crs, "target")
+    gcp_xy, gcp_crs = _projected(gcp_xy, gcp_crs, "GCP")
+    if target_crs is not None and gcp_crs is not None and gcp_crs != target_crs:
+        print("Reprojecting GCP layer to match target layer's CRS...")
+        gcp_xy = transform_points(gcp_xy, gcp_crs, target_crs)
+
+    # All nearest-GCP lookups in one batch
+    nearest, distances = PointGrid(gcp_xy, max_distance).nearest_within(target_xy, max_distance)
+    matched = np.nonzero(nearest >= 0)[0]
+    if not len(matched):
+        return [], None, None
+
+    target_match = target_xy[matched]
+    gcp_match = gcp_xy[nearest[matched]]
+    diff = target_match - gcp_match
+    rmse_easting, rmse_northing = np.sqrt(np.mean(diff ** 2, axis=0))
+
+    rows = [
+        (target_ids[i], *map(float, target), *map(float, gcp), *map(float, d), float(distances[i]))
+        for i, target, gcp, d in zip(matched, target_match, gcp_match, diff)
+    ]
+    return rows, float(rmse_easting), float(rmse_northing)
+
+
+def write_planimetric_report(output_folder, rows, rmse_easting, rmse_northing):
+    """Write report.csv in the layout of the ArcGIS planimetric RMSE tool"""
+    os.makedirs(output_folder, exist_ok=True)
+    path = os.path.join(output_folder, REPORT_FILENAME)
+    if rmse_easting is None:
+        rmse_easting = rmse_northing = f"N/A (No points within {MAX_GCP_DISTANCE:g}m)"
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Target_ID", "Target_Easting", "Target_Northing", "GCP_Easting", "GCP_Northing",
+                         "Difference_Easting", "Difference_Northing", "Distance (m)"])
+        writer.writerows(rows)
+        writer.writerow([])
+        writer.writerow(["RMSE_Easting", rmse_easting])
+        writer.writerow(["RMSE_Northing", rmse_northing])
+    return path
+
+
+def sample_raster(src, xy, bidx=1):
+    """Raster values at many points, reading each internal block at most once
+
+    xy is an (n, 2) array in the raster's CRS. Points are converted to pixel
+    indices together and grouped by the block they fall in; every block
+    holding at least one point is read once and its values gathered with
+    fancy indexing. Returns (values, valid): valid is False for points
+    outside the raster or on NoData / masked pixels.
+    """
+    values = np.full(len(xy), np.nan)
+    valid = np.zeros(len(xy), dtype=bool)
+    if not len(xy):
+        return values, valid
+
+    inverse = ~src.transform
+    cols = np.floor(inverse.a * xy[:, 0] + inverse.b * xy[:, 1] + inverse.c).astype(np.int64)
+    rows = np.floor(inverse.d * xy[:, 0] + inverse.e * xy[:, 1] + inverse.f).astype(np.int64)
+    inside = np.nonzero((rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width))[0]
+
+    # Points grouped by block, in block order
+    block_height, block_width = src.block_shapes[bidx - 1]
+    block_rows = rows[inside] // block_height
+    block_cols = cols[inside] // block_width
+    blocks_across = -(-src.width // block_width)
+    blocks, group, counts = np.unique(block_rows * blocks_across + block_cols,
+                                      return_inverse=True, return_counts=True)
+    by_block = np.split(inside[np.argsort(group, kind='stable')], np.cumsum(counts)[:-1])
+
+    for block, points in zip(blocks, by_block):
+        row_off = int(block // blocks_across) * block_height
+        col_off = int(block % blocks_across) * block_width
+        window = Window(col_off, row_off, min(block_width, src.width - col_off),
+                        min(block_height, src.height - row_off))
+        data = src.read(bidx, window=window, masked=True)
+        pixel_rows = rows[points] - row_off
+        pixel_cols = cols[points] - col_off
+        values[points] = np.ma.getdata(data)[pixel_rows, pixel_cols]
+        valid[points] = ~np.ma.getmaskarray(data)[pixel_rows, pixel_cols]
+
+    # NaN pixels count as NoData even when the band declares no NoData value
+    valid &= ~np.isnan(values)
+    return values, valid
+
+
+def height_rmse(elevation_path, gcps, bidx=1):
+    """Compare GCP heights with an elevation raster and compute the height RMSE
+
+    gcps is a read_points() result with the height field as its only value
+    column. Returns (rows, rmse): one (gcp_id, gcp_height, raster_height,
+    difference) row per GCP on a valid pixel, and None for the RMSE when
+    there is none. GCPs are reprojected to the raster's CRS if needed.
+    """
+    ids, xy, crs, values = gcps
+    heights = next(iter(values.values()))
+    with rasterio.open(elevation_path) as src:
+        if crs is not None and src.crs and crs != src.crs:
+            print("Reprojecting GCP layer to match the raster's CRS...")
+            xy = transform_points(xy, crs, src.crs)
+        raster_heights, valid = sample_raster(src, xy, bidx)
+
+    valid &= ~np.isnan(heights)
+    matched = np.nonzero(valid)[0]
+    if not len(matched):
+        return [], None
+
+    differences = heights[matched] - raster_heights[matched]
+    rmse = float(np.sqrt(np.mean(differences ** 2)))
+    rows = [
+        (ids[i], float(heights[i]), float(raster_heights[i]), float(d))
+        for i, d in zip(matched, differences)
+    ]
+    return rows, rmse
+
+
+def write_height_report(output_folder, rows, rmse):
+    """Write report.csv in the layout of the ArcGIS height RMSE tool"""
+    os.makedirs(output_folder, exist_ok=True)
+    path = os.path.join(output_folder, REPORT_FILENAME)
+    if rmse is None:
+        rmse = "N/A (No valid height points)"
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["GCP_ID", "GCP_Height", "Raster_Height", "Height_Difference (m)"])
+        writer.writerows(rows)
+        writer.writerow([])
+        writer.writerow(["RMSE", rmse])
+    return path
+
+
+def _add_point_arguments(parser, prefix):
+    """Options describing how to read a CSV point file"""
+    parser.add_argument(f'--{prefix}-layer', metavar='NAME',
+                        help="layer name in a multi-layer GeoPackage")
+    parser.add_argument(f'--{prefix}-x', default='x', metavar='FIELD',
+                        help="CSV column holding easting / longitude (default: x)")
+    parser.add_argument(f'--{prefix}-y', default='y', metavar='FIELD',
+                        help="CSV column holding northing / latitude (default: y)")
+    parser.add_argument(f'--{prefix}-id', metavar='FIELD',
+                        help="CSV column holding the point ID (default: row number)")
+    parser.add_argument(f'--{prefix}-crs', metavar='CRS',
+                        help="CRS of a CSV file, e.g. EPSG:32643")
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Check GCP accuracy and write an RMSE report.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    planimetric = commands.add_parser('planimetric',
+                                      help="easting/northing RMSE of target points against their nearest GCP")
+    planimetric.add_argument('targets', help="target points (GeoPackage, shapefile or CSV)")
+    planimetric.add_argument('gcps', help="GCP points (GeoPackage, shapefile or CSV)")
+    planimetric.add_argument('output_folder', help=f"folder for {REPORT_FILENAME}")
+    _add_point_arguments(planimetric, 'target')
+    _add_point_arguments(planimetric, 'gcp')
+
+    height = commands.add_parser('height', help="RMSE of GCP heights against an elevation raster")
+    height.add_argument('elevation', help="elevation raster")
+    height.add_argument('gcps', help="GCP points (GeoPackage, shapefile or CSV)")
+    height.add_argument('height_field', help="GCP attribute holding the surveyed height")
+    height.add_argument('output_folder', help=f"folder for {REPORT_FILENAME}")
+    height.add_argument('--band', type=int, default=1,
+                        help="raster band holding the elevations (default: 1)")
+    _add_point_arguments(height, 'gcp')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run a GCP accuracy check from the command line"""
+    args = parse_args(argv)
+    if args.command == 'planimetric':
+        targets = read_points(args.targets, args.target_layer, x_field=args.target_x, y_field=args.target_y,
+                              id_field=args.target_id, crs=args.target_crs)
+        gcps = read_points(args.gcps, args.gcp_layer, x_field=args.gcp_x, y_field=args.gcp_y,
+                           id_field=args.gcp_id, crs=args.gcp_crs)
+        rows, rmse_easting, rmse_northing = planimetric_rmse(targets, gcps)
+        path = write_planimetric_report(args.output_folder, rows, rmse_easting, rmse_northing)
+        print(f"Points within {MAX_GCP_DISTANCE:g} m: {len(rows)} of {len(targets[0])}")
+        if rmse_easting is not None:
+            print(f"RMSE easting: {rmse_easting:.3f} m, northing: {rmse_northing:.3f} m")
+    elif args.command == 'height':
+        gcps = read_points(args.gcps, args.gcp_layer, fields=(args.height_field,), x_field=args.gcp_x,
+                           y_field=args.gcp_y, id_field=args.gcp_id, crs=args.gcp_crs)
+        rows, rmse = height_rmse(args.elevation, gcps, args.band)
+        path = write_height_report(args.output_folder, rows, rmse)
+        print(f"GCPs on valid pixels: {len(rows)} of {len(gcps[0])}")
+        if rmse is not None:
+            print(f"Height RMSE: {rmse:.3f} m")
+    print(f"Report written: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+GeoTIFF Quality Report Generator
+Structured quality issue records
+"""
+
+from collections import Counter
+
+
+# Issue codes
+READ_ERROR = 'read_error'
+MISSING_CRS = 'missing_crs'
+NO_NODATA = 'no_nodata'
+SUSPICIOUS_VALUES = 'suspicious_values'
+SMALL_FILE = 'small_file'
+LARGE_FILE = 'large_file'
+NOT_ANALYZED = 'not_analyzed'
+
+# Severities, most severe first
+ERROR = 'error'
+WARNING = 'warning'
+INFO = 'info'
+
+SEVERITIES = {
+    READ_ERROR: ERROR,
+    MISSING_CRS: WARNING,
+    NO_NODATA: WARNING,
+    SUSPICIOUS_VALUES: WARNING,
+    SMALL_FILE: INFO,
+    LARGE_FILE: INFO,
+    NOT_ANALYZED: INFO,
+}
+
+
+def _suspicious_message(band, vmin, vmax):
+    suffix = "" if band == 1 else f" in band {band}"
+    return f"Suspicious data values{suffix} (min: {vmin:.2f}, max: {vmax:.2f})"
+
+
+# Message formatters, applied to an issue's payload at render time
+MESSAGES = {
+    READ_ERROR: lambda error: f"Error reading file - {error}",
+    MISSING_CRS: lambda: "Missing CRS",
+    NO_NODATA: lambda: "No NoData value defined",
+    SUSPICIOUS_VALUES: _suspicious_message,
+    SMALL_FILE: lambda size_mb: f"Very small file size ({size_mb:.2f} MB)",
+    LARGE_FILE: lambda size_mb: f"Very large file size ({size_mb:.2f} MB)",
+    NOT_ANALYZED: lambda: "Not deeply analyzed (pixel statistics skipped)",
+}
+
+
+class Issue:
+    """One quality issue: a code, the file it concerns and its payload
+
+    path identifies the file record; file is the name shown in the report.
+    """
+
+    __slots__ = ('code', 'path', 'file', 'severity', 'payload')
+
+    def __init__(self, code, path, file, payload=()):
+        self.code = code
+        self.path = path
+        self.file = file
+        self.severity = SEVERITIES[code]
+        self.payload = payload
+
+    def message(self):
+        """Human-readable description, without the file name"""
+        return MESSAGES[self.code](*self.payload)
+
+
+class IssueLog:
+    """Issue records grouped by file path, with running counts by code and by file
+
+    Grouping by path lets a file's issues be dropped when the file changes
+    or disappears, without touching anyone else's.
+    """
+
+    def __init__(self):
+        self.by_path = {}
+        self.by_code = Counter()
+        self.by_file = Counter()
+        self.total = 0
+
+    def add(self, code, path, file, *payload):
+        """Record an issue; payload holds the values its message is built from"""
+        self.by_path.setdefault(path, []).append(Issue(code, path, file, payload))
+        self.by_code[code] += 1
+        self.by_file[path] += 1
+        self.total += 1
+
+    def remove_file(self, path):
+        """Drop every issue recorded for a file"""
+        for issue in self.by_path.pop(path, ()):
+            self.by_code[issue.code] -= 1
+            if not self.by_code[issue.code]:
+                del self.by_code[issue.code]
+            self.total -= 1
+        self.by_file.pop(path, None)
+
+    def for_file(self, path):
+        """Issues of one file, in the order they were recorded"""
+        return self.by_path.get(path, [])
+
+    def count(self, code):
+        """Number of issues with this code"""
+        return self.by_code[code]
+
+    @property
+    def files_with_issues(self):
+        """Number of distinct files with at least one issue"""
+        return len(self.by_file)
+
+    def __len__(self):
+        return self.total
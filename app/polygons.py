@@ -0,0 +1,246 @@
+"""
+GeoTIFF Quality Report Generator
+Polygon overlay checks (work status, builtup vs. parcel) without ArcGIS
+
+    python -m app.polygons status TARGETS AVAILABLE OUTPUT_GPKG
+    python -m app.polygons builtup BUILTUP PARCELS OUTPUT_GPKG
+"""
+
+import argparse
+import os
+from collections import Counter, deque
+from itertools import islice
+
+from app.spatial import BoxIndex
+from app.vectors import LayerWriter, label_features, layer_crs, open_layer, read_features, transform_geometries
+from app.workers import ignore_interrupts
+
+
+# Target statuses
+COMPLETED = 'completed'
+PENDING = 'pending'
+
+# Relations of a builtup feature to the parcels
+WITHIN = 'within'
+CROSSING = 'crossing'
+OUTSIDE = 'outside'
+
+STATUS_FIELD = 'status'
+STATUS_LAYER = 'Target_Status'
+PENDING_LAYER = 'Pending_Areas'
+BUILTUP_LAYERS = {
+    WITHIN: 'builtup_within_parcel',
+    CROSSING: 'builtup_crossing_parcel',
+    OUTSIDE: 'builtup_outside_parcel',
+}
+
+# Target features per task handed to a worker process
+CHUNK_SIZE = 2000
+
+
+class PolygonIndex:
+    """Polygons behind a bounding-box R-tree, prepared for repeated predicate tests"""
+
+    def __init__(self, geometries):
+        import shapely
+
+        self.geometries = [g for g in geometries if g is not None and not g.is_empty]
+        shapely.prepare(self.geometries)
+        self.boxes = [g.bounds for g in self.geometries]
+        self.index = BoxIndex(self.boxes)
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def contains(self, geometry):
+        """True when some indexed polygon contains geometry (geometry is within it)"""
+        if geometry is None or geometry.is_empty:
+            return False
+        left, bottom, right, top = bounds = geometry.bounds
+        for i in self.index.query(bounds):
+            # Only polygons whose box encloses the geometry's box can contain it
+            box = self.boxes[i]
+            if box[0] <= left and box[1] <= bottom and box[2] >= right and box[3] >= top:
+                if self.geometries[i].contains(geometry):
+                    return True
+        return False
+
+    def relation(self, geometry):
+        """WITHIN some indexed polygon, CROSSING (intersecting without being
+        within any), or OUTSIDE all of them"""
+        if geometry is None or geometry.is_empty:
+            return OUTSIDE
+        left, bottom, right, top = bounds = geometry.bounds
+        intersecting = False
+        for i in self.index.query(bounds):
+            polygon = self.geometries[i]
+            box = self.boxes[i]
+            if box[0] <= left and box[1] <= bottom and box[2] >= right and box[3] >= top:
+                if polygon.contains(geometry):
+                    return WITHIN
+            if not intersecting and polygon.intersects(geometry):
+                intersecting = True
+        return CROSSING if intersecting else OUTSIDE
+
+
+# Index of the worker process, built once by _init_worker
+_worker_index = None
+
+
+def _init_worker(polygons):
+    """Process pool initializer: index the polygons once per worker"""
+    global _worker_index
+    ignore_interrupts()
+    _worker_index = PolygonIndex(polygons)
+
+
+def _status_chunk(geometries):
+    """Status of each target geometry in a chunk"""
+    return [COMPLETED if _worker_index.contains(g) else PENDING for g in geometries]
+
+
+def _relation_chunk(geometries):
+    """Relation of each builtup geometry in a chunk to the parcels"""
+    return [_worker_index.relation(g) for g in geometries]
+
+
+def map_chunks(function, polygons, geometries, workers=1, chunk_size=CHUNK_SIZE):
+    """Apply a chunk function to geometries against indexed polygons, in order
+
+    geometries may be any iterable and is consumed lazily. With several
+    workers, chunks go to a process pool that indexes the polygons once per
+    process, with a bounded number of chunks in flight; results are still
+    yielded in input order, one per geometry.
+    """
+    global _worker_index
+    geometries = iter(geometries)
+    chunks = iter(lambda: list(islice(geometries, chunk_size)), [])
+    if workers <= 1:
+        _worker_index = PolygonIndex(polygons)
+        try:
+            for chunk in chunks:
+                yield from function(chunk)
+        finally:
+            _worker_index = None
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    max_pending = workers * 4
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(polygons,)) as executor:
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            while len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def mark_status(target_path, available_path, output_path, target_layer=None, available_layer=None, workers=1):
+    """Mark target polygons 'completed' when within an available polygon, else 'pending'
+
+    The available polygons are reprojected to the target CRS, indexed once
+    and tested with prepared contains predicates. The targets are read in
+    one streaming pass; each is written as it is classified, with a status
+    field, to STATUS_LAYER and, when pending, to PENDING_LAYER of the output
+    GeoPackage. Returns a Counter of statuses.
+    """
+    _, available, available_crs = read_features(available_path, available_layer)
+    target_crs = layer_crs(target_path, target_layer)
+    if available_crs is not None and target_crs is not None and available_crs != target_crs:
+        print("Reprojecting available layer to match the target layer's CRS...")
+        available = transform_geometries(available, available_crs, target_crs)
+
+    counts = Counter()
+    with open_layer(target_path, target_layer) as targets:
+        writer = LayerWriter(output_path, targets, {STATUS_LAYER: STATUS_FIELD, PENDING_LAYER: None})
+        try:
+            classify = lambda geometries: map_chunks(_status_chunk, available, geometries, workers)
+            for feature, status in label_features(targets, classify):
+                counts[status] += 1
+                writer.write(STATUS_LAYER, feature, status)
+                if status == PENDING:
+                    writer.write(PENDING_LAYER, feature)
+        finally:
+            writer.close()
+    return counts
+
+
+def classify_builtup(builtup_path, parcel_path, output_path, builtup_layer=None, parcel_layer=None, workers=1):
+    """Label every builtup feature as within a parcel, crossing parcels, or outside them
+
+    The parcels are reprojected to the builtup CRS and indexed once; the
+    builtup features are then labelled in one streaming pass, using box
+    prefiltering and prepared predicates, and each is written to its
+    BUILTUP_LAYERS layer of the output GeoPackage as it is labelled.
+    Returns a Counter of labels with the parcel count under 'parcels'.
+    """
+    parcel_ids, parcels, parcel_crs = read_features(parcel_path, parcel_layer)
+    builtup_crs = layer_crs(builtup_path, builtup_layer)
+    if parcel_crs is not None and builtup_crs is not None and parcel_crs != builtup_crs:
+        print("Reprojecting parcel layer to match the builtup layer's CRS...")
+        parcels = transform_geometries(parcels, parcel_crs, builtup_crs)
+
+    counts = Counter()
+    with open_layer(builtup_path, builtup_layer) as builtup:
+        writer = LayerWriter(output_path, builtup, dict.fromkeys(BUILTUP_LAYERS.values()))
+        try:
+            classify = lambda geometries: map_chunks(_relation_chunk, parcels, geometries, workers)
+            for feature, label in label_features(builtup, classify):
+                counts[label] += 1
+                writer.write(BUILTUP_LAYERS[label], feature)
+        finally:
+            writer.close()
+
+    counts['parcels'] = len(parcel_ids)
+    return counts
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Overlay checks for polygon layers.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    status = commands.add_parser('status', help="mark target polygons completed when within an available polygon")
+    status.add_argument('targets', help="target polygons (GeoPackage or shapefile)")
+    status.add_argument('available', help="available (completed work) polygons")
+    status.add_argument('output', help=f"GeoPackage for the {STATUS_LAYER} and {PENDING_LAYER} layers")
+    status.add_argument('--target-layer', metavar='NAME', help="layer name in a multi-layer GeoPackage")
+    status.add_argument('--available-layer', metavar='NAME', help="layer name in a multi-layer GeoPackage")
+    status.add_argument('-j', '--workers', type=int, default=1,
+                        help="worker processes for the predicate tests (0 = all cores)")
+
+    builtup = commands.add_parser('builtup', help="classify builtup features as within, crossing or outside parcels")
+    builtup.add_argument('builtup', help="builtup polygons (GeoPackage or shapefile)")
+    builtup.add_argument('parcels', help="parcel polygons (GeoPackage or shapefile)")
+    builtup.add_argument('output', help="GeoPackage for the " + ", ".join(BUILTUP_LAYERS.values()) + " layers")
+    builtup.add_argument('--builtup-layer', metavar='NAME', help="layer name in a multi-layer GeoPackage")
+    builtup.add_argument('--parcel-layer', metavar='NAME', help="layer name in a multi-layer GeoPackage")
+    builtup.add_argument('-j', '--workers', type=int, default=1,
+                         help="worker processes for the predicate tests (0 = all cores)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run a polygon overlay check from the command line"""
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    if args.command == 'status':
+        counts = mark_status(args.targets, args.available, args.output, args.target_layer, args.available_layer,
+                             workers)
+        print(f"Completed: {counts[COMPLETED]}")
+        print(f"Pending: {counts[PENDING]}")
+        print(f"Status layers written: {args.output}")
+    elif args.command == 'builtup':
+        counts = classify_builtup(args.builtup, args.parcels, args.output, args.builtup_layer, args.parcel_layer,
+                                  workers)
+        print(f"Number of builtup features: {counts[WITHIN] + counts[CROSSING] + counts[OUTSIDE]}")
+        print(f"Number of parcel features: {counts['parcels']}")
+        print(f"Number of features within a parcel: {counts[WITHIN]}")
+        print(f"Number of crossing features: {counts[CROSSING]}")
+        print(f"Number of features outside all parcels: {counts[OUTSIDE]}")
+        print(f"Builtup layers written: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+GeoTIFF Quality Report Generator
+Bounded read-ahead pipeline
+"""
+
+import queue
+import threading
+
+
+# Blocks read ahead of the consumer by default
+DEFAULT_PREFETCH_DEPTH = 2
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=DEFAULT_PREFETCH_DEPTH):
+    """Iterate over iterable while a reader thread produces up to depth items ahead
+
+    The reader fills a bounded queue, so it blocks (backpressure) once it is
+    depth items ahead of the consumer. GDAL releases the GIL while reading
+    and decompressing, so the next blocks are fetched while the calling
+    thread reduces the current one. Exceptions raised by the reader are
+    re-raised in the consumer. A depth of 0 disables the thread.
+
+    Only one reader thread is used per iterable: a rasterio dataset handle
+    must not be read from several threads at once.
+    """
+    if depth <= 0:
+        yield from iterable
+        return
+
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Poll so an abandoned consumer never leaves the reader blocked
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+
+    thread = threading.Thread(target=reader, name="geotiff-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
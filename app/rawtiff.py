@@ -0,0 +1,238 @@
+"""
+GeoTIFF Quality Report Generator
+Zero-copy pixel access for uncompressed GeoTIFFs
+"""
+
+import math
+import os
+import struct
+
+import numpy as np
+from rasterio.enums import MaskFlags
+
+
+# TIFF tags needed to locate the full-resolution image data
+IMAGE_WIDTH = 256
+IMAGE_LENGTH = 257
+BITS_PER_SAMPLE = 258
+COMPRESSION = 259
+STRIP_OFFSETS = 273
+SAMPLES_PER_PIXEL = 277
+STRIP_BYTE_COUNTS = 279
+PLANAR_CONFIGURATION = 284
+TILE_WIDTH = 322
+TILE_LENGTH = 323
+TILE_OFFSETS = 324
+TILE_BYTE_COUNTS = 325
+
+# Integer field types: TIFF type code -> struct format
+FIELD_TYPES = {1: 'B', 3: 'H', 4: 'I', 16: 'Q'}
+
+COMPRESSION_NONE = 1
+PLANAR_CONTIG = 1
+PLANAR_SEPARATE = 2
+
+
+def _read_ifd(f):
+    """Read the integer tags of the first IFD; returns (byte_order, tags)"""
+    header = f.read(16)
+    if len(header) < 8 or header[:2] not in (b'II', b'MM'):
+        return None, None
+    order = '<' if header[:2] == b'II' else '>'
+    magic = struct.unpack(order + 'H', header[2:4])[0]
+    if magic == 42:
+        ifd_offset = struct.unpack(order + 'I', header[4:8])[0]
+        count_format, entry_format, inline_size = 'H', 'HHI', 4
+    elif magic == 43:
+        ifd_offset = struct.unpack(order + 'Q', header[8:16])[0]
+        count_format, entry_format, inline_size = 'Q', 'HHQ', 8
+    else:
+        return None, None
+
+    f.seek(ifd_offset)
+    count_size = struct.calcsize(count_format)
+    entries = struct.unpack(order + count_format, f.read(count_size))[0]
+    entry_size = struct.calcsize(order + entry_format) + inline_size
+    raw = f.read(entries * entry_size)
+
+    tags = {}
+    for i in range(entries):
+        entry = raw[i * entry_size:(i + 1) * entry_size]
+        tag, field_type, count = struct.unpack(order + entry_format, entry[:-inline_size])
+        if field_type not in FIELD_TYPES:
+            continue
+        item = FIELD_TYPES[field_type]
+        size = struct.calcsize(item) * count
+        if size <= inline_size:
+            data = entry[-inline_size:][:size]
+        else:
+            position = f.tell()
+            f.seek(struct.unpack(order + ('I' if inline_size == 4 else 'Q'), entry[-inline_size:])[0])
+            data = f.read(size)
+            f.seek(position)
+        tags[tag] = np.frombuffer(data, dtype=np.dtype(order + item))
+    return order, tags
+
+
+def read_tiff_layout(path):
+    """Describe where the pixels of an uncompressed, contiguous TIFF live
+
+    Only the first (full-resolution) IFD is inspected. Returns None when the
+    image is compressed, sparse, not byte-aligned, or its strips or tiles are
+    not stored back to back in order, since those cannot be viewed in place.
+    """
+    with open(path, 'rb') as f:
+        order, tags = _read_ifd(f)
+    if not tags:
+        return None
+
+    def value(tag, default=None):
+        return int(tags[tag][0]) if tag in tags else default
+
+    if value(COMPRESSION, COMPRESSION_NONE) != COMPRESSION_NONE:
+        return None
+    bits = tags.get(BITS_PER_SAMPLE, np.array([1]))
+    if len(set(bits.tolist())) != 1 or bits[0] % 8:
+        return None
+
+    layout = {
+        'byte_order': order,
+        'width': value(IMAGE_WIDTH),
+        'height': value(IMAGE_LENGTH),
+        'samples': value(SAMPLES_PER_PIXEL, 1),
+        'itemsize': int(bits[0]) // 8,
+        'planar': value(PLANAR_CONFIGURATION, PLANAR_CONTIG),
+        'tiled': TILE_OFFSETS in tags,
+    }
+    if layout['width'] is None or layout['height'] is None:
+        return None
+
+    if layout['tiled']:
+        offsets, counts = tags.get(TILE_OFFSETS), tags.get(TILE_BYTE_COUNTS)
+        layout['tile_width'] = value(TILE_WIDTH)
+        layout['tile_height'] = value(TILE_LENGTH)
+        if not layout['tile_width'] or not layout['tile_height']:
+            return None
+    else:
+        offsets, counts = tags.get(STRIP_OFFSETS), tags.get(STRIP_BYTE_COUNTS)
+    if offsets is None or counts is None or len(offsets) != len(counts) or len(offsets) == 0:
+        return None
+
+    # Blocks must follow each other without gaps, in storage order
+    offsets = offsets.astype(np.int64)
+    counts = counts.astype(np.int64)
+    if np.any(counts <= 0) or np.any(offsets[1:] != offsets[:-1] + counts[:-1]):
+        return None
+
+    if layout['tiled']:
+        tiles_across = math.ceil(layout['width'] / layout['tile_width'])
+        tiles_down = math.ceil(layout['height'] / layout['tile_height'])
+        expected = (tiles_down * tiles_across * layout['tile_width'] * layout['tile_height']
+                    * layout['samples'] * layout['itemsize'])
+    else:
+        expected = layout['width'] * layout['height'] * layout['samples'] * layout['itemsize']
+    if int(counts.sum()) != expected:
+        return None
+
+    layout['offset'] = int(offsets[0])
+    return layout
+
+
+def _has_plain_masks(src):
+    """True when the dataset mask is nothing more than each band's NoData value"""
+    return all(flags in ([MaskFlags.all_valid], [MaskFlags.nodata]) for flags in src.mask_flag_enums)
+
+
+def map_pixels(src):
+    """Return a MappedRaster over an open rasterio dataset, or None
+
+    None means the file must be read through rasterio: it is not a local
+    uncompressed GeoTIFF with a contiguous layout, or its masks come from
+    somewhere other than the NoData value (alpha bands, mask files).
+    """
+    if src.driver != 'GTiff' or not os.path.isfile(src.name) or src.count == 0:
+        return None
+    if len(set(src.dtypes)) != 1 or np.dtype(src.dtypes[0]).kind not in 'iuf':
+        return None
+    if not _has_plain_masks(src):
+        return None
+
+    try:
+        layout = read_tiff_layout(src.name)
+    except (OSError, struct.error, ValueError):
+        return None
+    if layout is None:
+        return None
+
+    dtype = np.dtype(src.dtypes[0]).newbyteorder(layout['byte_order'])
+    if (layout['width'], layout['height'], layout['samples']) != (src.width, src.height, src.count):
+        return None
+    if layout['itemsize'] != dtype.itemsize:
+        return None
+    return MappedRaster(src.name, layout, dtype)
+
+
+class MappedRaster:
+    """Pixel data of an uncompressed GeoTIFF viewed in place with numpy.memmap
+
+    Blocks are yielded as (bands, ...) views of the mapped file, so no pixel
+    is copied until the caller converts it.
+    """
+
+    def __init__(self, path, layout, dtype):
+        self.layout = layout
+        self.width = layout['width']
+        self.height = layout['height']
+        self.bands = layout['samples']
+        separate = layout['planar'] == PLANAR_SEPARATE
+
+        if layout['tiled']:
+            self.tiles_across = math.ceil(self.width / layout['tile_width'])
+            self.tiles_down = math.ceil(self.height / layout['tile_height'])
+            grid = (self.tiles_down, self.tiles_across, layout['tile_height'], layout['tile_width'])
+            shape = (self.bands,) + grid if separate else grid + (self.bands,)
+        else:
+            shape = (self.bands, self.height, self.width) if separate else (self.height, self.width, self.bands)
+        self.pixels = np.memmap(path, dtype=dtype, mode='r', offset=layout['offset'], shape=shape)
+
+    def iter_blocks(self, min_pixels):
+        """Yield (data, inside) pairs covering the raster in row order
+
+        data is a (bands, ...) view; inside is None or a boolean array shaped
+        like data[0] that is False on the padding of partial edge tiles.
+        """
+        if self.layout['tiled']:
+            yield from self._iter_tile_rows(min_pixels)
+            return
+
+        separate = self.layout['planar'] == PLANAR_SEPARATE
+        rows = max(1, min_pixels // self.width)
+        for row in range(0, self.height, rows):
+            if separate:
+                yield self.pixels[:, row:row + rows], None
+            else:
+                yield self.pixels[row:row + rows].transpose(2, 0, 1), None
+
+    def _iter_tile_rows(self, min_pixels):
+        """Yield whole rows of tiles, grouped to roughly min_pixels"""
+        tile_height = self.layout['tile_height']
+        tile_width = self.layout['tile_width']
+        separate = self.layout['planar'] == PLANAR_SEPARATE
+        row_pixels = self.tiles_across * tile_width * tile_height
+        step = max(1, min_pixels // row_pixels)
+
+        # Column validity is the same for every tile row
+        columns = (np.arange(self.tiles_across)[:, None] * tile_width + np.arange(tile_width)) < self.width
+        for first in range(0, self.tiles_down, step):
+            last = min(first + step, self.tiles_down)
+            if separate:
+                # (bands, tile rows, tiles across, tile height, tile width)
+                data = self.pixels[:, first:last].transpose(0, 1, 3, 2, 4)
+            else:
+                # (tile rows, tiles across, tile height, tile width, bands)
+                data = self.pixels[first:last].transpose(4, 0, 2, 1, 3)
+
+            # (tile rows, tile height, tiles across, tile width)
+            rows = (np.arange(first, last)[:, None] * tile_height + np.arange(tile_height)) < self.height
+            inside = rows[:, :, None, None] & columns[None, None, :, :]
+            yield data, (None if inside.all() else inside)
@@ -0,0 +1,210 @@
+"""
+GeoTIFF Quality Report Generator
+Sharded runs: deterministic file subsets and mergeable partial results
+"""
+
+import argparse
+import gzip
+import json
+import math
+import zlib
+from collections import Counter
+
+from app.sketch import QuantileSketch
+
+
+PARTIAL_FORMAT = "geotiff-quality-partial/1"
+
+PARTIAL_SUFFIX = ".partial.jsonl.gz"
+
+
+def parse_shard(text):
+    """Parse an 'INDEX/COUNT' shard spec (0-based index) for argparse"""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT, got {text!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}")
+    return index, count
+
+
+def in_shard(relpath, shard):
+    """True when a file belongs to shard (index, count)
+
+    Files are assigned by a CRC32 of their path relative to its root, with
+    '/' separators, so every node computes the same split without
+    coordinating, wherever it mounts the data.
+    """
+    index, count = shard
+    return zlib.crc32(relpath.replace('\\', '/').encode('utf-8')) % count == index
+
+
+def shard_aggregates(records):
+    """Mergeable aggregates of a shard: counts, moment sums, bounds and histograms
+
+    records may be any iterable and is consumed once. Per band, 'pixels',
+    'sum' and 'sum_sq' are the valid-pixel count and the first two raw
+    moments recovered from each file's mean and std, so shards combine by
+    plain addition; 'histogram' is the merged quantile sketch of the band's
+    file histograms.
+    """
+    files = 0
+    datum = Counter()
+    pixel_sizes = Counter()
+    bands = {}
+    bounds = None
+    total_area = 0.0
+    for record in records:
+        files += 1
+        if 'error' in record:
+            continue
+        datum[record['crs'] or 'No CRS'] += 1
+        pixel_sizes[f"{abs(record['transform'][0]):.4f}"] += 1
+        total_area += record['area']
+
+        left, bottom, right, top = record['bounds']
+        if bounds is None:
+            bounds = [left, bottom, right, top]
+        else:
+            bounds = [min(bounds[0], left), min(bounds[1], bottom), max(bounds[2], right), max(bounds[3], top)]
+
+        for stats in record.get('bands') or []:
+            if stats['valid_pixels'] == 0:
+                continue
+            n = stats['valid_pixels']
+            totals = bands.setdefault(str(stats['band']), {
+                'pixels': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': math.inf, 'max': -math.inf, 'histogram': None,
+            })
+            totals['histogram'] = _merge_histograms(totals['histogram'], stats.get('histogram'))
+            totals['pixels'] += n
+            totals['sum'] += n * stats['mean']
+            totals['sum_sq'] += n * (stats['std'] ** 2 + stats['mean'] ** 2)
+            totals['min'] = min(totals['min'], stats['min'])
+            totals['max'] = max(totals['max'], stats['max'])
+
+    return {
+        'files': files,
+        'datum_summary': dict(datum),
+        'pixel_size_summary': dict(pixel_sizes),
+        'total_area': total_area,
+        'bounds': bounds,
+        'bands': bands,
+    }
+
+
+def _merge_histograms(histogram, other):
+    """Merge two QuantileSketch.to_dict() histograms, either of which may be None"""
+    if histogram is None or other is None:
+        return histogram or other
+    sketch = QuantileSketch.from_dict(histogram)
+    sketch.merge(QuantileSketch.from_dict(other))
+    return sketch.to_dict()
+
+
+def merge_aggregates(aggregates):
+    """Combine shard_aggregates() results from several shards"""
+    merged = {'files': 0, 'datum_summary': Counter(), 'pixel_size_summary': Counter(),
+              'total_area': 0.0, 'bounds': None, 'bands': {}}
+    for part in aggregates:
+        merged['files'] += part['files']
+        merged['datum_summary'].update(part['datum_summary'])
+        merged['pixel_size_summary'].update(part['pixel_size_summary'])
+        merged['total_area'] += part['total_area']
+        if part['bounds'] is not None:
+            if merged['bounds'] is None:
+                merged['bounds'] = list(part['bounds'])
+            else:
+                b = merged['bounds']
+                merged['bounds'] = [min(b[0], part['bounds'][0]), min(b[1], part['bounds'][1]),
+                                    max(b[2], part['bounds'][2]), max(b[3], part['bounds'][3])]
+        for band, totals in part['bands'].items():
+            into = merged['bands'].setdefault(band, {
+                'pixels': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': math.inf, 'max': -math.inf, 'histogram': None,
+            })
+            into['histogram'] = _merge_histograms(into['histogram'], totals['histogram'])
+            into['pixels'] += totals['pixels']
+            into['sum'] += totals['sum']
+            into['sum_sq'] += totals['sum_sq']
+            into['min'] = min(into['min'], totals['min'])
+            into['max'] = max(into['max'], totals['max'])
+    merged['datum_summary'] = dict(merged['datum_summary'])
+    merged['pixel_size_summary'] = dict(merged['pixel_size_summary'])
+    return merged
+
+
+def aggregates_match(expected, actual, rel_tol=1e-9):
+    """True when two aggregates agree: counts and histograms exactly, sums
+    up to floating-point rounding from adding in a different order"""
+    def close(a, b):
+        return math.isclose(a, b, rel_tol=rel_tol, abs_tol=rel_tol)
+
+    if (expected['files'] != actual['files']
+            or dict(expected['datum_summary']) != dict(actual['datum_summary'])
+            or dict(expected['pixel_size_summary']) != dict(actual['pixel_size_summary'])
+            or not close(expected['total_area'], actual['total_area'])
+            or (expected['bounds'] is None) != (actual['bounds'] is None)
+            or expected['bands'].keys() != actual['bands'].keys()):
+        return False
+    if expected['bounds'] is not None and not all(map(close, expected['bounds'], actual['bounds'])):
+        return False
+    for band, totals in expected['bands'].items():
+        other = actual['bands'][band]
+        if (totals['pixels'] != other['pixels'] or totals['min'] != other['min'] or totals['max'] != other['max']
+                or not close(totals['sum'], other['sum']) or not close(totals['sum_sq'], other['sum_sq'])
+                or totals['histogram'] != other['histogram']):
+            return False
+    return True
+
+
+def write_partial(path, header, records, order):
+    """Write a shard's partial result file
+
+    The first line is the header (with the shard's aggregates); each
+    following line holds one file record and its position ('seq') in the
+    full, unsharded discovery order. Records are written in seq order, so
+    partials can be merged by streaming them side by side.
+    """
+    header = {'format': PARTIAL_FORMAT, **header, 'aggregates': shard_aggregates(records)}
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(header) + '\n')
+        for record in sorted(records, key=lambda record: order[record['path']]):
+            f.write(json.dumps({'seq': order[record['path']], 'record': record}) + '\n')
+    return path
+
+
+def read_partial_header(path):
+    """Read the header line of a partial result file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+    if header.get('format') != PARTIAL_FORMAT:
+        raise ValueError(f"{path} is not a partial result file")
+    return header
+
+
+def iter_partial(path):
+    """Yield the (seq, record) pairs of a partial result file one at a time"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        f.readline()
+        for entry in map(json.loads, f):
+            yield entry['seq'], entry['record']
+
+
+def check_shards(headers):
+    """Check that partial result headers belong to one sharded run
+
+    Raises ValueError for different analyzer versions or settings, shard
+    counts that differ, or a shard given more than once. Returns the sorted
+    indices of the shards missing from the set.
+    """
+    if len({header['version'] for header in headers}) > 1:
+        raise ValueError("Partial results come from different analyzer versions or settings")
+    shards = [tuple(header['shard']) for header in headers]
+    counts = sorted({count for _, count in shards})
+    if len(counts) > 1:
+        raise ValueError(f"Partial results use different shard counts: {', '.join(map(str, counts))}")
+    duplicates = sorted(shard for shard, seen in Counter(shards).items() if seen > 1)
+    if duplicates:
+        raise ValueError(f"Shard given more than once: {', '.join(f'{i}/{n}' for i, n in duplicates)}")
+    present = {index for index, _ in shards}
+    return [index for index in range(counts[0]) if index not in present]
@@ -0,0 +1,124 @@
+"""
+GeoTIFF Quality Report Generator
+Mergeable quantile sketch for streaming percentiles
+"""
+
+import math
+
+
+# Relative accuracy of the reported percentiles
+RELATIVE_ACCURACY = 0.01
+
+# Magnitudes below this are counted in the zero bucket
+MIN_MAGNITUDE = 1e-9
+
+
+class QuantileSketch:
+    """Logarithmic-bucket quantile sketch with bounded relative error
+
+    Values are counted in buckets whose bounds grow geometrically, so a
+    percentile is estimated within RELATIVE_ACCURACY of its true value and
+    sketches of separate blocks, bands or files merge by adding counts.
+    Merging and querying are pure Python; only add_array needs NumPy.
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def add_array(self, values):
+        """Add a 1-D NumPy array of values; NaN and infinities are ignored"""
+        import numpy as np
+
+        values = values[np.isfinite(values)]
+        magnitudes = np.abs(values)
+        small = magnitudes < MIN_MAGNITUDE
+        self.zero += int(small.sum())
+        self.count += int(values.size)
+        for buckets, part in ((self.positive, values > 0), (self.negative, values < 0)):
+            part &= ~small
+            if not part.any():
+                continue
+            keys = np.ceil(np.log(magnitudes[part]) / self.log_gamma).astype(np.int64)
+            offset = int(keys.min())
+            counts = np.bincount(keys - offset)
+            for key in np.flatnonzero(counts).tolist():
+                buckets[key + offset] = buckets.get(key + offset, 0) + int(counts[key])
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy"""
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+
+    def subtract(self, other):
+        """Remove the counts of a sketch previously merged into this one"""
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                remaining = buckets.get(key, 0) - count
+                if remaining > 0:
+                    buckets[key] = remaining
+                else:
+                    buckets.pop(key, None)
+        self.zero -= other.zero
+        self.count -= other.count
+
+    def _bucket_value(self, key):
+        """Representative magnitude of a bucket"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Estimate the q-quantile (0 <= q <= 1); None when the sketch is empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive)) if self.positive else 0.0
+
+    def percentiles(self, points=(1, 50, 99)):
+        """Return {'p<n>': value} for the given percentile points"""
+        return {f"p{p}": self.quantile(p / 100) for p in points}
+
+    def to_dict(self):
+        """Compact JSON-friendly form: dense bucket counts from an offset"""
+        data = {'accuracy': self.relative_accuracy, 'zero': self.zero}
+        for name, buckets in (('positive', self.positive), ('negative', self.negative)):
+            if buckets:
+                offset = min(buckets)
+                counts = [0] * (max(buckets) - offset + 1)
+                for key, count in buckets.items():
+                    counts[key - offset] = count
+                data[name] = [offset, counts]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch from to_dict() output"""
+        sketch = cls(data['accuracy'])
+        sketch.zero = data['zero']
+        sketch.count = sketch.zero
+        for name in ('positive', 'negative'):
+            if name in data:
+                offset, counts = data[name]
+                buckets = {offset + i: count for i, count in enumerate(counts) if count}
+                setattr(sketch, name, buckets)
+                sketch.count += sum(buckets.values())
+        return sketch
@@ -0,0 +1,93 @@
+"""
+GeoTIFF Quality Report Generator
+Bounding-box spatial index
+"""
+
+import math
+
+
+class BoxIndex:
+    """Static R-tree over (left, bottom, right, top) boxes, bulk-loaded with
+    Sort-Tile-Recursive packing
+
+    Queries return the positions of the indexed boxes, so callers can keep
+    their own records in a parallel list.
+    """
+
+    def __init__(self, boxes, node_capacity=16):
+        self.boxes = [tuple(box) for box in boxes]
+        self.node_capacity = node_capacity
+        self.root = None
+
+        # Leaf entries are (left, bottom, right, top, item index)
+        nodes = [(*box, i) for i, box in enumerate(self.boxes)]
+        leaf = True
+        while nodes:
+            nodes = self._pack(nodes, leaf)
+            leaf = False
+            if len(nodes) == 1:
+                self.root = nodes[0]
+                break
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _pack(self, entries, leaf):
+        """Group entries into parent nodes of at most node_capacity children"""
+        capacity = self.node_capacity
+        node_count = math.ceil(len(entries) / capacity)
+        slice_size = capacity * math.ceil(math.sqrt(node_count))
+
+        entries = sorted(entries, key=lambda e: e[0] + e[2])
+        parents = []
+        for start in range(0, len(entries), slice_size):
+            vertical_slice = sorted(entries[start:start + slice_size], key=lambda e: e[1] + e[3])
+            for group_start in range(0, len(vertical_slice), capacity):
+                children = vertical_slice[group_start:group_start + capacity]
+                parents.append((
+                    min(c[0] for c in children),
+                    min(c[1] for c in children),
+                    max(c[2] for c in children),
+                    max(c[3] for c in children),
+                    children,
+                    leaf,
+                ))
+        return parents
+
+    def query(self, box):
+        """Return indices of boxes intersecting box (touching edges included)"""
+        if self.root is None:
+            return []
+        left, bottom, right, top = box
+        hits = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for child in node[4]:
+                if child[0] <= right and child[2] >= left and child[1] <= top and child[3] >= bottom:
+                    if node[5]:
+                        hits.append(child[4])
+                    else:
+                        stack.append(child)
+        return hits
+
+
+def boxes_overlap(box1, box2):
+    """True when two boxes share interior area (touching edges do not count)"""
+    return (box1[0] < box2[2] and box1[2] > box2[0] and
+            box1[1] < box2[3] and box1[3] > box2[1])
+
+
+def find_overlapping_pairs(boxes):
+    """Return sorted (i, j) index pairs, i < j, of boxes whose interiors overlap
+
+    Runs in roughly O(n log n + k) for n boxes and k candidate pairs.
+    """
+    index = BoxIndex(boxes)
+    pairs = []
+    for i, box in enumerate(index.boxes):
+        for j in index.query(box):
+            if j > i and boxes_overlap(box, index.boxes[j]):
+                pairs.append((i, j))
+    pairs.sort()
+    return pairs
@@ -0,0 +1,249 @@
+"""
+GeoTIFF Quality Report Generator
+Streaming raster statistics
+"""
+
+import math
+
+import numpy as np
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+
+from app.prefetch import DEFAULT_PREFETCH_DEPTH, prefetch
+from app.rawtiff import map_pixels
+from app.sketch import QuantileSketch
+
+
+# Strip-organised files often store one row per block, so consecutive strips
+# are coalesced into reads of roughly this many pixels
+MIN_WINDOW_PIXELS = 1 << 20
+
+
+class RunningStats:
+    """Running per-band min/max/mean/variance over a stream of pixel blocks
+
+    All moments are NumPy arrays with one entry per band, so every band of a
+    block is reduced in the same vectorized pass. Each band also feeds a
+    mergeable QuantileSketch for percentiles.
+    """
+
+    def __init__(self, bands):
+        self.bands = bands
+        self.count = np.zeros(bands, dtype=np.int64)
+        self.mean = np.zeros(bands, dtype=np.float64)
+        self.m2 = np.zeros(bands, dtype=np.float64)
+        self.min = np.full(bands, np.inf)
+        self.max = np.full(bands, -np.inf)
+        self.sketches = [QuantileSketch() for _ in range(bands)]
+
+    def update(self, block):
+        """Add a masked (bands, rows, cols) block; masked pixels are skipped"""
+        bands = block.shape[0]
+        valid = ~np.ma.getmaskarray(block).reshape(bands, -1)
+        values = np.ma.getdata(block).reshape(bands, -1).astype(np.float64)
+        self.update_values(values, valid)
+
+    def update_values(self, values, valid):
+        """Add (bands, pixels) float64 values where valid is True"""
+        bands = values.shape[0]
+        count = valid.sum(axis=1)
+        masked_values = np.where(valid, values, 0.0)
+        mean = np.divide(masked_values.sum(axis=1), count, out=np.zeros(bands), where=count > 0)
+        deviations = np.where(valid, values - mean[:, None], 0.0)
+        m2 = np.square(deviations).sum(axis=1)
+        vmin = np.where(valid, values, np.inf).min(axis=1)
+        vmax = np.where(valid, values, -np.inf).max(axis=1)
+        self._combine(count, mean, m2, vmin, vmax)
+        for index, sketch in enumerate(self.sketches):
+            sketch.add_array(values[index][valid[index]])
+
+    def merge(self, other):
+        """Merge another RunningStats over the same bands into this one"""
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+
+    def _combine(self, count, mean, m2, vmin, vmax):
+        """Combine partial moments (Chan et al. parallel variance)"""
+        total = self.count + count
+        delta = mean - self.mean
+        weight = np.divide(count, total, out=np.zeros(self.bands), where=total > 0)
+        self.m2 = self.m2 + m2 + delta * delta * self.count * weight
+        self.mean = self.mean + delta * weight
+        self.count = total
+        self.min = np.minimum(self.min, vmin)
+        self.max = np.maximum(self.max, vmax)
+
+    @property
+    def std(self):
+        """Population standard deviation per band (matches numpy.std)"""
+        return np.sqrt(np.divide(self.m2, self.count, out=np.zeros(self.bands), where=self.count > 0))
+
+    def band(self, index):
+        """Return the statistics of one band (0-based) as plain Python values"""
+        count = int(self.count[index])
+        if count == 0:
+            return {'valid_pixels': 0}
+        return {
+            'valid_pixels': count,
+            'min': float(self.min[index]),
+            'max': float(self.max[index]),
+            'mean': float(self.mean[index]),
+            'std': float(self.std[index]),
+            'percentiles': self.sketches[index].percentiles(),
+            'histogram': self.sketches[index].to_dict(),
+        }
+
+
+def iter_windows(src, bidx=1, min_pixels=MIN_WINDOW_PIXELS):
+    """Yield read windows following the file's internal block layout"""
+    pending = None
+    for _, window in src.block_windows(bidx):
+        # Tiled layouts are read block by block
+        if window.width != src.width:
+            yield window
+            continue
+
+        # Full-width strips are merged until the window is large enough
+        if pending is None:
+            pending = window
+        else:
+            pending = Window(0, pending.row_off, src.width, pending.height + window.height)
+        if pending.width * pending.height >= min_pixels:
+            yield pending
+            pending = None
+
+    if pending is not None:
+        yield pending
+
+
+def _count_read(counters, block):
+    """Add one read block to the 'blocks_read' / 'bytes_read' I/O counters"""
+    if counters is not None:
+        counters['blocks_read'] = counters.get('blocks_read', 0) + 1
+        counters['bytes_read'] = counters.get('bytes_read', 0) + np.ma.getdata(block).nbytes
+
+
+def _valid_values(values, nodata, dtype):
+    """Mask of values that differ from a band's NoData value, as GDAL masks them"""
+    if nodata is None:
+        return np.ones(values.shape, dtype=bool)
+    if math.isnan(nodata):
+        return ~np.isnan(values)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        if nodata != int(nodata) or not info.min <= nodata <= info.max:
+            # GDAL masks nothing when NoData cannot occur in the data type
+            return np.ones(values.shape, dtype=bool)
+    else:
+        # Compare at the band's own precision
+        nodata = float(np.asarray(nodata).astype(dtype))
+    return values != nodata
+
+
+def _add_row_counts(row_valid, row, valid):
+    """Add the valid pixels of each row of a (rows, ...) band-1 mask to row_valid[row:]"""
+    if row_valid is None:
+        return
+    counts = valid.reshape(valid.shape[0], -1).sum(axis=1)
+    end = min(row + len(counts), len(row_valid))
+    row_valid[row:end] += counts[:end - row]
+
+
+def mapped_band_statistics(src, raster, counters=None, row_valid=None):
+    """Compute statistics for every band straight from a MappedRaster
+
+    Each block is a view of the memory-mapped file; the only copy made is
+    the float64 conversion the reduction needs anyway.
+    """
+    stats = RunningStats(src.count)
+    total_pixels = 0
+    row = 0
+    dtype = np.dtype(src.dtypes[0])
+    for data, inside in raster.iter_blocks(MIN_WINDOW_PIXELS):
+        _count_read(counters, data)
+        values = np.asarray(data, dtype=np.float64, order='C').reshape(src.count, -1)
+        valid = np.stack([_valid_values(values[index], nodata, dtype)
+                          for index, nodata in enumerate(src.nodatavals)])
+        if inside is None:
+            total_pixels += values.shape[1]
+        else:
+            inside = inside.reshape(-1)
+            valid &= inside
+            total_pixels += int(inside.sum())
+        stats.update_values(values, valid)
+
+        # Strips are (bands, rows, width); rows of tiles are (bands, tile
+        # rows, tile height, ...), padded past the last row
+        rows = data.shape[1] if data.ndim == 3 else data.shape[1] * data.shape[2]
+        _add_row_counts(row_valid, row, valid[0].reshape(rows, -1))
+        row += rows
+    return stats, total_pixels
+
+
+def band_statistics(src, prefetch_depth=DEFAULT_PREFETCH_DEPTH, counters=None, row_valid=None):
+    """Compute statistics for every band, reading one block at a time
+
+    Each block is read once for all bands, up to prefetch_depth blocks
+    ahead on a reader thread. Returns a (RunningStats, pixels_per_band)
+    tuple; peak memory depends on the block size rather than the raster size.
+    Blocks and decoded bytes read are added to the optional counters dict,
+    and the number of valid band 1 pixels in each row to the optional
+    row_valid array (src.height entries).
+    Uncompressed, contiguous GeoTIFFs are read through a memory map instead.
+    """
+    raster = map_pixels(src)
+    if raster is not None:
+        return mapped_band_statistics(src, raster, counters, row_valid)
+
+    stats = RunningStats(src.count)
+    total_pixels = 0
+    blocks = ((window, src.read(window=window, masked=True)) for window in iter_windows(src))
+    for window, block in prefetch(blocks, prefetch_depth):
+        _count_read(counters, block)
+        total_pixels += block.shape[1] * block.shape[2]
+        stats.update(block)
+        _add_row_counts(row_valid, int(window.row_off), ~np.ma.getmaskarray(block[0]))
+    return stats, total_pixels
+
+
+def decimation_factor(src, bidx, max_pixels):
+    """Pick the read decimation factor that keeps a band under max_pixels
+
+    Existing overview levels are preferred so GDAL can serve the read from
+    them; without a suitable overview the band is decimated on read.
+    """
+    factor = max(1, math.ceil(math.sqrt(src.width * src.height / max_pixels)))
+    while math.ceil(src.width / factor) * math.ceil(src.height / factor) > max_pixels:
+        factor += 1
+    if factor == 1:
+        return 1
+
+    overviews = [level for level in src.overviews(bidx) if level >= factor]
+    return min(overviews) if overviews else factor
+
+
+def approximate_band_statistics(src, max_pixels, prefetch_depth=DEFAULT_PREFETCH_DEPTH, counters=None,
+                                row_valid=None):
+    """Estimate statistics for every band from a reduced-resolution read
+
+    Returns a (RunningStats, sampled_pixels_per_band, factor) tuple. A
+    factor of 1 means the raster fits the budget and was read exactly.
+    row_valid (see band_statistics) then receives estimated counts: every
+    row gets the valid pixels of the sampled row it falls in, scaled to the
+    full width.
+    """
+    factor = decimation_factor(src, 1, max_pixels)
+    if factor == 1:
+        stats, total_pixels = band_statistics(src, prefetch_depth, counters, row_valid)
+        return stats, total_pixels, 1
+
+    out_shape = (src.count, math.ceil(src.height / factor), math.ceil(src.width / factor))
+    sample = src.read(out_shape=out_shape, masked=True, resampling=Resampling.nearest)
+    _count_read(counters, sample)
+    stats = RunningStats(src.count)
+    stats.update(sample)
+    if row_valid is not None:
+        sampled_rows = (~np.ma.getmaskarray(sample[0])).sum(axis=1) * (src.width / out_shape[2])
+        row_valid += sampled_rows[np.arange(src.height) * out_shape[1] // src.height]
+    return stats, out_shape[1] * out_shape[2], factor
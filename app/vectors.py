@@ -0,0 +1,250 @@
+"""
+GeoTIFF Quality Report Generator
+Vector layer I/O for the GCP and parcel checks
+"""
+
+import csv
+import os
+from collections import Counter, deque
+
+import numpy as np
+
+
+# Features written per GeoPackage transaction
+WRITE_BATCH_SIZE = 10000
+
+
+def _fiona():
+    """Import fiona, which reads and writes GeoPackage and shapefile layers"""
+    try:
+        import fiona
+    except ImportError:
+        raise RuntimeError("GeoPackage and shapefile layers require fiona (pip install fiona)")
+    return fiona
+
+
+def _shapely():
+    """Import shapely, used for geometry predicates and centroids"""
+    try:
+        import shapely
+        import shapely.geometry
+    except ImportError:
+        raise RuntimeError("Polygon checks require shapely (pip install shapely)")
+    return shapely
+
+
+def is_csv(path):
+    """True for delimited text point files"""
+    return os.path.splitext(path)[1].lower() in ('.csv', '.txt')
+
+
+def _crs_from_fiona(crs):
+    """rasterio CRS for a fiona collection CRS, or None"""
+    from rasterio.crs import CRS
+
+    if not crs:
+        return None
+    return CRS.from_wkt(crs.to_wkt()) if hasattr(crs, 'to_wkt') else CRS.from_user_input(crs)
+
+
+def _feature_id(feature):
+    """Feature ID as an int where the driver uses numeric IDs"""
+    return int(feature.id) if str(feature.id).isdigit() else feature.id
+
+
+def layer_crs(path, layer=None):
+    """rasterio CRS of a GeoPackage or shapefile layer, or None"""
+    with _fiona().open(path, layer=layer) as collection:
+        return _crs_from_fiona(collection.crs)
+
+
+def iter_features(path, layer=None):
+    """Stream (feature ID, shapely geometry) pairs from a layer
+
+    Features without geometry yield None as their geometry.
+    """
+    geometry_from = _shapely().geometry.shape
+    with _fiona().open(path, layer=layer) as collection:
+        for feature in collection:
+            geometry = feature.geometry
+            yield _feature_id(feature), geometry_from(geometry) if geometry is not None else None
+
+
+def read_features(path, layer=None):
+    """Load a layer's feature IDs and shapely geometries; returns (ids, geometries, crs)"""
+    ids = []
+    geometries = []
+    for feature_id, geometry in iter_features(path, layer):
+        ids.append(feature_id)
+        geometries.append(geometry)
+    return ids, geometries, layer_crs(path, layer)
+
+
+def open_layer(path, layer=None):
+    """Open a GeoPackage or shapefile layer for reading (a fiona collection)"""
+    return _fiona().open(path, layer=layer)
+
+
+def label_features(collection, classify):
+    """Read a layer once, yielding (feature, label) pairs in source order
+
+    classify is called once with an iterable of the features' shapely
+    geometries (None for features without one) and must return an iterable
+    of labels in the same order, e.g. map_chunks. It may read ahead; only
+    the features it has read but not yet labelled are held in memory.
+    """
+    geometry_from = _shapely().geometry.shape
+    waiting = deque()
+
+    def geometries():
+        for feature in collection:
+            waiting.append(feature)
+            yield geometry_from(feature.geometry) if feature.geometry is not None else None
+
+    for label in classify(geometries()):
+        yield waiting.popleft(), label
+
+
+class LayerWriter:
+    """Write features of one source layer into several GeoPackage layers
+
+    Every output layer gets the source schema and CRS; layers maps each
+    layer name to the name of a text field added to it (or overwritten),
+    or None. An existing layer of the same name is replaced. Features are
+    written in batches of WRITE_BATCH_SIZE, one transaction each.
+    """
+
+    def __init__(self, output, collection, layers):
+        fiona = _fiona()
+        self.fields = dict(layers)
+        self.sinks = {}
+        self.batches = {}
+        self.counts = Counter()
+        for name, field in self.fields.items():
+            schema = {'geometry': collection.schema['geometry'],
+                      'properties': dict(collection.schema['properties'])}
+            if field:
+                schema['properties'][field] = 'str:10'
+            self.sinks[name] = fiona.open(output, 'w', driver='GPKG', layer=name, schema=schema, crs=collection.crs)
+            self.batches[name] = []
+
+    def write(self, layer, feature, value=None):
+        """Queue a source feature for a layer, with value in the layer's added field"""
+        properties = dict(feature.properties)
+        if self.fields[layer]:
+            properties[self.fields[layer]] = value
+        batch = self.batches[layer]
+        batch.append({'geometry': feature.geometry, 'properties': properties})
+        if len(batch) >= WRITE_BATCH_SIZE:
+            self._flush(layer)
+
+    def _flush(self, layer):
+        batch = self.batches[layer]
+        if batch:
+            self.sinks[layer].writerecords(batch)
+            self.counts[layer] += len(batch)
+            self.batches[layer] = []
+
+    def close(self):
+        """Write the remaining features and close every layer; returns a Counter of features per layer"""
+        try:
+            for layer in self.sinks:
+                self._flush(layer)
+        finally:
+            for sink in self.sinks.values():
+                sink.close()
+        return self.counts
+
+
+def read_points(path, layer=None, fields=(), x_field='x', y_field='y', id_field=None, crs=None):
+    """Load a point layer into NumPy arrays
+
+    Returns (ids, xy, crs, values): ids is a list, xy an (n, 2) float array,
+    crs a rasterio CRS (or None) and values maps each requested attribute
+    field to an array. GeoPackage and shapefile layers use their feature IDs
+    and point coordinates (the centroid for other geometry types). CSV files
+    read coordinates from x_field / y_field, IDs from id_field (1-based row
+    numbers by default), and take their CRS from the crs argument.
+    """
+    if is_csv(path):
+        return _read_csv_points(path, fields, x_field, y_field, id_field, crs)
+
+    fiona = _fiona()
+    ids = []
+    coords = []
+    columns = {name: [] for name in fields}
+    with fiona.open(path, layer=layer) as collection:
+        missing = [name for name in fields if name not in collection.schema['properties']]
+        if missing:
+            raise ValueError(f"Field does not exist in {path}: {', '.join(missing)}")
+        layer_crs = _crs_from_fiona(collection.crs)
+        for feature in collection:
+            geometry = feature.geometry
+            if geometry is None:
+                continue
+            if geometry.type == 'Point':
+                coords.append(geometry.coordinates[:2])
+            else:
+                centroid = _shapely().geometry.shape(geometry).centroid
+                coords.append((centroid.x, centroid.y))
+            ids.append(_feature_id(feature))
+            for name in fields:
+                columns[name].append(feature.properties[name])
+
+    xy = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    values = {name: np.array(column, dtype=np.float64) for name, column in columns.items()}
+    return ids, xy, layer_crs or crs, values
+
+
+def _read_csv_points(path, fields, x_field, y_field, id_field, crs):
+    """read_points for CSV files"""
+    ids = []
+    coords = []
+    columns = {name: [] for name in fields}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        required = [x_field, y_field, *fields] + ([id_field] if id_field else [])
+        missing = [name for name in required if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Field does not exist in {path}: {', '.join(missing)}")
+        for number, row in enumerate(reader, start=1):
+            coords.append((float(row[x_field]), float(row[y_field])))
+            ids.append(row[id_field] if id_field else number)
+            for name in fields:
+                columns[name].append(float(row[name]) if row[name] not in ('', None) else np.nan)
+
+    if crs is not None:
+        from rasterio.crs import CRS
+
+        crs = CRS.from_user_input(crs)
+    xy = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    values = {name: np.array(column, dtype=np.float64) for name, column in columns.items()}
+    return ids, xy, crs, values
+
+
+def transform_points(xy, src_crs, dst_crs):
+    """Reproject an (n, 2) coordinate array between CRSs in one batch"""
+    from rasterio.warp import transform
+
+    if len(xy) == 0 or src_crs == dst_crs:
+        return xy
+    xs, ys = transform(src_crs, dst_crs, xy[:, 0], xy[:, 1])
+    return np.column_stack([xs, ys])
+
+
+def transform_geometries(geometries, src_crs, dst_crs):
+    """Reproject shapely geometries, transforming all their coordinates in one batch"""
+    shapely = _shapely()
+    if src_crs is None or dst_crs is None or src_crs == dst_crs:
+        return geometries
+    return list(shapely.transform(np.array(geometries, dtype=object),
+                                  lambda coords: transform_points(coords, src_crs, dst_crs)))
+
+
+def utm_crs(xy, crs):
+    """WGS 84 / UTM north zone containing the centre of geographic points"""
+    from rasterio.crs import CRS
+
+    lon = transform_points(xy, crs, CRS.from_epsg(4326))[:, 0]
+    centre = (lon.min() + lon.max()) / 2
+    return CRS.from_epsg(32600 + int((centre + 180) / 6) + 1)
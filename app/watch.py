@@ -0,0 +1,72 @@
+"""
+GeoTIFF Quality Report Generator
+Polling watcher for delivery folders
+"""
+
+import os
+
+from app.discovery import iter_geotiffs
+
+
+# Seconds between folder scans in watch mode
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Seconds without further changes before the report is regenerated
+DEFAULT_DEBOUNCE = 30.0
+
+
+class FolderWatcher:
+    """Detects new, changed and removed GeoTIFFs by polling their size and mtime
+
+    A new or changed file is only reported once its size and modification
+    time are the same on two consecutive scans, so files that are still
+    being copied in are not analyzed half-written.
+    """
+
+    def __init__(self, roots, recursive=False, include=(), exclude=()):
+        self.roots = roots
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.known = {}
+        self.settling = {}
+
+    def _signatures(self):
+        """Map path -> (name, (size, mtime_ns)) for every GeoTIFF currently present"""
+        signatures = {}
+        for name, path in iter_geotiffs(self.roots, self.recursive, self.include, self.exclude):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (name, (stat.st_size, stat.st_mtime_ns))
+        return signatures
+
+    def prime(self):
+        """Take the current folder contents as already seen"""
+        self.known = {path: signature for path, (_, signature) in self._signatures().items()}
+        self.settling = {}
+
+    def scan(self):
+        """Scan once; returns (changed, removed)
+
+        changed lists (name, path) for settled new or modified files and
+        removed lists the paths of files that disappeared.
+        """
+        current = self._signatures()
+        removed = [path for path in self.known if path not in current]
+        for path in removed:
+            del self.known[path]
+
+        changed = []
+        settling = {}
+        for path, (name, signature) in current.items():
+            if self.known.get(path) == signature:
+                continue
+            if self.settling.get(path) == signature:
+                self.known[path] = signature
+                changed.append((name, path))
+            else:
+                settling[path] = signature
+        self.settling = settling
+        return changed, removed
@@ -0,0 +1,11 @@
+"""
+GeoTIFF Quality Report Generator
+Process pool helpers shared by the report, watch and overlay tools
+"""
+
+import signal
+
+
+def ignore_interrupts():
+    """Process pool initializer: leave Ctrl+C to the parent process"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
@@ -0,0 +1,150 @@
+"""
+GeoTIFF Quality Report Generator
+Reproducible synthetic GeoTIFF corpora for benchmarking
+
+Each named configuration fixes raster size, layout, compression, data type,
+NoData density, band count and overviews. Files are laid out as a grid of
+adjacent tiles and filled from a seeded random generator, so the same
+configuration and seed always produce identical files.
+
+    python benchmarks/corpus.py /tmp/geotiff-bench --config tiled-deflate-float32 --files 50
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+
+
+CONFIGS = {
+    'striped-raw-float32': {
+        'width': 2048, 'height': 2048, 'tiled': False, 'compress': None,
+        'dtype': 'float32', 'nodata_fraction': 0.05, 'bands': 1, 'overviews': False,
+    },
+    'tiled-raw-int16': {
+        'width': 2048, 'height': 2048, 'tiled': True, 'compress': None,
+        'dtype': 'int16', 'nodata_fraction': 0.0, 'bands': 1, 'overviews': False,
+    },
+    'tiled-deflate-float32': {
+        'width': 2048, 'height': 2048, 'tiled': True, 'compress': 'deflate',
+        'dtype': 'float32', 'nodata_fraction': 0.2, 'bands': 1, 'overviews': False,
+    },
+    'tiled-deflate-float32-ovr': {
+        'width': 2048, 'height': 2048, 'tiled': True, 'compress': 'deflate',
+        'dtype': 'float32', 'nodata_fraction': 0.2, 'bands': 1, 'overviews': True,
+    },
+    'striped-lzw-uint16': {
+        'width': 2048, 'height': 2048, 'tiled': False, 'compress': 'lzw',
+        'dtype': 'uint16', 'nodata_fraction': 0.5, 'bands': 1, 'overviews': False,
+    },
+    'tiled-lzw-uint8-rgba': {
+        'width': 2048, 'height': 2048, 'tiled': True, 'compress': 'lzw',
+        'dtype': 'uint8', 'nodata_fraction': 0.1, 'bands': 4, 'overviews': True,
+    },
+}
+
+MANIFEST = "corpus.json"
+
+# Ground size of one pixel in the synthetic UTM grid (metres)
+PIXEL_SIZE = 0.5
+
+
+def _synthetic_band(rng, height, width, dtype):
+    """Smooth terrain-like surface plus noise, scaled to the data type"""
+    rows = np.linspace(0, 4 * np.pi, height)[:, None]
+    cols = np.linspace(0, 4 * np.pi, width)[None, :]
+    phase = rng.uniform(0, 2 * np.pi, 2)
+    surface = np.sin(rows + phase[0]) * np.cos(cols + phase[1])
+    surface = surface + rng.normal(0, 0.1, (height, width))
+
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        # Stay clear of the NoData values chosen by _nodata_value
+        low = 1 if np.issubdtype(np.dtype(dtype), np.unsignedinteger) else -100
+        high = min(np.iinfo(dtype).max, 4000)
+        return (low + (surface + 1.5) / 3 * (high - low)).clip(low, high).astype(dtype)
+    return (500 + 300 * surface).astype(dtype)
+
+
+def _nodata_value(dtype):
+    """NoData value used for a data type"""
+    return 0 if np.issubdtype(np.dtype(dtype), np.unsignedinteger) else -9999
+
+
+def generate_corpus(out_dir, config_name, files=20, seed=0, scale=1.0):
+    """Write a corpus for one configuration; returns the list of file paths
+
+    An existing corpus with the same parameters is reused.
+    """
+    config = dict(CONFIGS[config_name])
+    config['width'] = max(64, int(config['width'] * scale))
+    config['height'] = max(64, int(config['height'] * scale))
+    params = {'config': config_name, 'files': files, 'seed': seed, 'scale': scale, **config}
+
+    corpus_dir = os.path.join(out_dir, config_name)
+    manifest_path = os.path.join(corpus_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest['params'] == params:
+            return [os.path.join(corpus_dir, name) for name in manifest['files']]
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    width, height, dtype = config['width'], config['height'], config['dtype']
+    nodata = _nodata_value(dtype) if config['nodata_fraction'] > 0 else None
+    columns = max(1, int(np.ceil(np.sqrt(files))))
+
+    profile = {
+        'driver': 'GTiff', 'width': width, 'height': height, 'count': config['bands'],
+        'dtype': dtype, 'crs': 'EPSG:32643', 'nodata': nodata,
+    }
+    if config['tiled']:
+        profile.update(tiled=True, blockxsize=256, blockysize=256)
+    if config['compress']:
+        profile['compress'] = config['compress']
+
+    names = []
+    for i in range(files):
+        row, col = divmod(i, columns)
+        profile['transform'] = from_origin(
+            500000 + col * width * PIXEL_SIZE, 2000000 - row * height * PIXEL_SIZE, PIXEL_SIZE, PIXEL_SIZE
+        )
+        data = np.stack([_synthetic_band(rng, height, width, dtype) for _ in range(config['bands'])])
+        if nodata is not None:
+            data[:, rng.random((height, width)) < config['nodata_fraction']] = nodata
+
+        name = f"{config_name}_{i:04d}.tif"
+        path = os.path.join(corpus_dir, name)
+        with rasterio.open(path, 'w', **profile) as dst:
+            dst.write(data)
+            if config['overviews']:
+                dst.build_overviews([2, 4, 8, 16], Resampling.average)
+        names.append(name)
+
+    with open(manifest_path, 'w') as f:
+        json.dump({'params': params, 'files': names}, f, indent=2)
+    return [os.path.join(corpus_dir, name) for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic GeoTIFF benchmark corpora.")
+    parser.add_argument('out_dir', help="folder receiving one sub-folder per configuration")
+    parser.add_argument('--config', action='append', choices=sorted(CONFIGS),
+                        help="configuration to generate (repeatable; default: all)")
+    parser.add_argument('--files', type=int, default=20, help="files per configuration")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--scale', type=float, default=1.0, help="scale factor for raster width and height")
+    args = parser.parse_args()
+
+    for config_name in args.config or sorted(CONFIGS):
+        paths = generate_corpus(args.out_dir, config_name, args.files, args.seed, args.scale)
+        size = sum(os.path.getsize(p) for p in paths) / (1024 * 1024)
+        print(f"{config_name}: {len(paths)} files, {size:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
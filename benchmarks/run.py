@@ -0,0 +1,168 @@
+"""
+GeoTIFF Quality Report Generator
+Throughput benchmark for GeoTiffAnalyzer
+
+Generates (or reuses) synthetic corpora with benchmarks/corpus.py and runs
+each scenario in a fresh interpreter, timing discovery, analysis and report
+rendering separately. Reports files/s, MB/s, the peak RSS of the main
+process and of the largest worker process, and compares against a JSON
+baseline:
+
+    python benchmarks/run.py --corpus-dir /tmp/geotiff-bench --save-baseline baseline.json
+    python benchmarks/run.py --corpus-dir /tmp/geotiff-bench --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+
+def peak_rss_mb():
+    """Peak resident set size in MB of this process and of its largest worker
+
+    The worker figure is the peak of the single largest child process that
+    has exited (None without workers), not a total over all of them.
+    Returns (None, None) where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    worker_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / scale, (worker_peak / scale if worker_peak else None)
+
+
+def measure(corpus_dir, workers, approx_pixels):
+    """Time one scenario in the current process; returns a result dict"""
+    from app.app import GeoTiffAnalyzer
+    from app.discovery import iter_geotiffs
+
+    start = time.perf_counter()
+    files = list(iter_geotiffs([corpus_dir]))
+    discovery_s = time.perf_counter() - start
+
+    analyzer = GeoTiffAnalyzer(workers=workers, approx_pixels=approx_pixels)
+    analyzer.folder = corpus_dir
+    analyzer.roots = [corpus_dir]
+    analyzer.geotiff_files = [name for name, _ in files]
+
+    start = time.perf_counter()
+    analyzer.analyze_files()
+    analysis_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer.output_path = os.path.join(tmp, "report.pdf")
+        start = time.perf_counter()
+        analyzer.write_report()
+        render_s = time.perf_counter() - start
+
+    megabytes = sum(os.path.getsize(path) for _, path in files) / (1024 * 1024)
+    peak_rss, worker_peak_rss = peak_rss_mb()
+    return {
+        'files': len(files),
+        'megabytes': megabytes,
+        'discovery_s': discovery_s,
+        'analysis_s': analysis_s,
+        'render_s': render_s,
+        'files_per_s': len(files) / analysis_s if analysis_s else None,
+        'mb_per_s': megabytes / analysis_s if analysis_s else None,
+        'peak_rss_mb': peak_rss,
+        'worker_peak_rss_mb': worker_peak_rss,
+    }
+
+
+def run_isolated(corpus_dir, workers, approx_pixels):
+    """Run measure() in a fresh interpreter so peak RSS is per scenario"""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        command = [sys.executable, __file__, '--measure', corpus_dir, '--result-file', result_path,
+                   '--workers', str(workers)]
+        if approx_pixels:
+            command += ['--approx-pixels', str(approx_pixels)]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput changes against a baseline; returns the regressed scenarios"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline or not baseline[key].get('files_per_s'):
+            continue
+        ratio = result['files_per_s'] / baseline[key]['files_per_s']
+        status = "REGRESSION" if ratio < 1 - tolerance else "ok"
+        print(f"  {key}: {ratio:.2f}x baseline files/s ({status})")
+        if status != "ok":
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    from corpus import CONFIGS, generate_corpus
+
+    parser = argparse.ArgumentParser(description="Benchmark GeoTIFF analysis throughput.")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), "geotiff-bench"),
+                        help="where synthetic corpora are generated and cached")
+    parser.add_argument('--config', action='append', choices=sorted(CONFIGS),
+                        help="corpus configuration to run (repeatable; default: all)")
+    parser.add_argument('--files', type=int, default=20, help="files per corpus")
+    parser.add_argument('--scale', type=float, default=1.0, help="scale factor for raster width and height")
+    parser.add_argument('--seed', type=int, default=0, help="corpus random seed")
+    parser.add_argument('--workers', type=int, action='append', help="worker counts to run (repeatable; default: 1)")
+    parser.add_argument('--approx-pixels', type=int, help="run in approximate statistics mode")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per scenario; the fastest is kept")
+    parser.add_argument('--baseline', help="JSON baseline to compare against")
+    parser.add_argument('--save-baseline', help="write the results as a new JSON baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed files/s drop before failing")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        result = measure(args.measure, (args.workers or [1])[0], args.approx_pixels)
+        with open(args.result_file, 'w') as f:
+            json.dump(result, f)
+        return
+
+    results = {}
+    print(f"{'scenario':44} {'files':>5} {'disc s':>7} {'anal s':>7} {'rend s':>7} "
+          f"{'files/s':>8} {'MB/s':>7} {'RSS MB':>7} {'wRSS MB':>7}")
+    for config_name in args.config or sorted(CONFIGS):
+        corpus_dir = os.path.dirname(generate_corpus(args.corpus_dir, config_name, args.files, args.seed, args.scale)[0])
+        for workers in args.workers or [1]:
+            key = f"{config_name}/workers={workers}" + (f"/approx={args.approx_pixels}" if args.approx_pixels else "")
+            runs = [run_isolated(corpus_dir, workers, args.approx_pixels) for _ in range(args.repeat)]
+            result = min(runs, key=lambda r: r['analysis_s'])
+            results[key] = result
+            rss = " ".join(f"{result[name]:7.0f}" if result.get(name) is not None else f"{'n/a':>7}"
+                           for name in ('peak_rss_mb', 'worker_peak_rss_mb'))
+            print(f"{key:44} {result['files']:5d} {result['discovery_s']:7.3f} {result['analysis_s']:7.2f} "
+                  f"{result['render_s']:7.2f} {result['files_per_s']:8.2f} {result['mb_per_s']:7.1f} {rss}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("Comparison with baseline:")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
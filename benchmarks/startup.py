@@ -0,0 +1,109 @@
+"""
+GeoTIFF Quality Report Generator
+Startup benchmark based on python -X importtime
+
+Runs the report entry point in fresh interpreters and reports wall time,
+total import time and the most expensive imports. By default it measures
+`main.py --help`; pass report arguments after `--` to time a real
+metadata-only run, e.g. a fully cached re-report:
+
+    python benchmarks/startup.py -- D:/tiles --output D:/tiles/report.pdf
+
+With --cached the run must be a fully cached re-report, and the benchmark
+fails if it loads rasterio or numpy.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy stacks that should only load on the code path that needs them
+WATCHED_MODULES = ('wx', 'reportlab', 'rasterio', 'numpy')
+
+# Stacks a fully cached re-report must not load
+RASTER_MODULES = ('rasterio', 'numpy')
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def run_once(args):
+    """Run the entry point once; returns (wall seconds, import timings)"""
+    code = "import sys; from app.app import main; main(sys.argv[1:])"
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code, *args],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode not in (0, None):
+        raise SystemExit(f"Run failed ({result.returncode}):\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start cost of the report entry point.")
+    parser.add_argument('-n', '--repeat', type=int, default=5, help="number of fresh interpreters to time")
+    parser.add_argument('--top', type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    parser.add_argument('--cached', action='store_true',
+                        help="fail if the run loads rasterio or numpy (for fully cached re-reports)")
+    parser.add_argument('app_args', nargs=argparse.REMAINDER, help="arguments for main.py (after --)")
+    args = parser.parse_args()
+
+    app_args = [a for a in args.app_args if a != '--'] or ['--help']
+    walls = []
+    import_totals = []
+    timings = {}
+    for _ in range(args.repeat):
+        wall, timings = run_once(app_args)
+        walls.append(wall)
+        import_totals.append(sum(self_us for self_us, _ in timings.values()) / 1e6)
+
+    results = {
+        'args': app_args,
+        'wall_s_median': statistics.median(walls),
+        'wall_s_min': min(walls),
+        'import_s_median': statistics.median(import_totals),
+        'loaded': {module: module in timings for module in WATCHED_MODULES},
+        'slowest_imports': sorted(
+            ((name, cumulative / 1e6) for name, (_, cumulative) in timings.items()),
+            key=lambda item: item[1], reverse=True
+        )[:args.top],
+    }
+
+    print(f"Command: main.py {' '.join(app_args)}")
+    print(f"Wall time (median of {args.repeat}): {results['wall_s_median']:.3f} s (min {results['wall_s_min']:.3f} s)")
+    print(f"Import time (median): {results['import_s_median']:.3f} s")
+    for module, loaded_flag in results['loaded'].items():
+        print(f"  {module}: {'loaded' if loaded_flag else 'not loaded'}")
+    print("Slowest imports (cumulative):")
+    for name, seconds in results['slowest_imports']:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.cached:
+        loaded = [module for module in RASTER_MODULES if results['loaded'][module]]
+        if loaded:
+            raise SystemExit(f"Fully cached run loaded {', '.join(loaded)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-bin\python.exe bin\pip.pyz install reportlab wxpython rasterio
\ No newline at end of file
+bin\python.exe bin\pip.pyz install reportlab wxpython rasterio pyarrow fiona shapely
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+GeoTIFF Quality Report Generator
+Ellipsoidal footprint areas and row-weighted valid areas
+"""
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from app.analysis import analyze_file
+from app.area import footprint_area, row_cell_areas, valid_footprint_area
+
+
+WGS84 = CRS.from_epsg(4326)
+
+
+def test_wgs84_globe():
+    area = footprint_area(WGS84, (1, 0, -180, 0, -1, 90), 360, 180)
+    assert area / 1e6 == pytest.approx(510065621.7, abs=0.1)
+
+
+def test_one_degree_cell_at_equator():
+    assert footprint_area(WGS84, (1, 0, 0, 0, -1, 1), 1, 1) / 1e6 == pytest.approx(12308, rel=1e-4)
+    # Finer pixels over the same cell add up to the same area
+    assert footprint_area(WGS84, (0.25, 0, 0, 0, -0.25, 1), 4, 4) == pytest.approx(
+        footprint_area(WGS84, (1, 0, 0, 0, -1, 1), 1, 1), rel=1e-12)
+
+
+def test_rows_add_up_to_footprint():
+    transform = (0.5, 0, 10, 0, -0.5, 80)
+    areas = row_cell_areas((6378137.0, 298.257223563), 80, -0.5, 100)
+    assert areas.sum() * 0.5 * 30 == pytest.approx(footprint_area(WGS84, transform, 30, 100), rel=1e-12)
+    # Rows shrink towards the pole
+    assert np.all(np.diff(areas) > 0)
+
+    row_valid = np.zeros(100)
+    row_valid[-1] = 30
+    assert valid_footprint_area(WGS84, transform, row_valid) == pytest.approx(areas[-1] * 0.5 * 30)
+
+
+def test_projected_area_uses_pixel_size():
+    assert footprint_area(CRS.from_epsg(32633), (10, 0, 500000, 0, -10, 4000000), 20, 30) == 10 * 10 * 20 * 30
+
+
+@pytest.mark.parametrize('options,approx_pixels', [
+    ({'compress': 'none'}, None),
+    ({'compress': 'deflate', 'tiled': True, 'blockxsize': 16, 'blockysize': 16}, None),
+    ({'compress': 'deflate'}, 600),
+])
+def test_valid_area_weights_nodata_by_row(tmp_path, options, approx_pixels):
+    # 40 rows from 80°N to 0°; NoData fills the half of every row nearest the equator
+    height, width = 40, 40
+    data = np.ones((1, height, width), dtype='uint8')
+    data[0, 20:, :] = 0
+    path = tmp_path / "geographic.tif"
+    transform = from_origin(0, 80, 2, 2)
+    with rasterio.open(path, 'w', driver='GTiff', width=width, height=height, count=1, dtype='uint8',
+                       nodata=0, crs=WGS84, transform=transform, **options) as dst:
+        dst.write(data)
+
+    record = analyze_file("geographic.tif", str(path), approx_pixels=approx_pixels)
+    areas = row_cell_areas((6378137.0, 298.257223563), 80, -2, height)
+    expected = areas[:20].sum() * 2 * width
+    assert record['valid_area'] == pytest.approx(expected, rel=1e-9 if approx_pixels is None else 0.05)
+    # Spreading NoData evenly would overstate the polar half's area
+    assert record['area'] / 2 > expected * 1.2
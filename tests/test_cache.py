@@ -0,0 +1,68 @@
+"""
+GeoTIFF Quality Report Generator
+ResultCache hits, misses, failure records and pruning
+"""
+
+import os
+
+from app.cache import ResultCache
+
+
+def _file(path, content=b'data'):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_hit_after_store(tmp_path):
+    filepath = _file(tmp_path / "a.tif")
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        record, key = cache.lookup(filepath)
+        assert record is None
+        cache.store(key, {'file': 'a.tif', 'width': 10})
+
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        record, _ = cache.lookup(filepath)
+        assert record == {'file': 'a.tif', 'width': 10}
+        assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_miss_on_change_or_version(tmp_path):
+    filepath = _file(tmp_path / "a.tif")
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        _, key = cache.lookup(filepath)
+        cache.store(key, {'file': 'a.tif'})
+
+    with ResultCache(str(tmp_path / "cache.sqlite"), "2") as cache:
+        assert cache.lookup(filepath)[0] is None
+
+    stat = os.stat(filepath)
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.lookup(filepath)[0] is None
+        assert cache.lookup(str(tmp_path / "missing.tif")) == (None, None)
+        assert cache.misses == 2
+
+
+def test_failures_are_not_cached(tmp_path):
+    filepath = _file(tmp_path / "a.tif")
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        _, key = cache.lookup(filepath)
+        cache.store(key, {'file': 'a.tif', 'error': "read failed"})
+        assert cache.lookup(filepath)[0] is None
+        cache.store(key, {'file': 'a.tif', 'width': 10, 'band_error': "block read failed"})
+        assert cache.lookup(filepath)[0] is None
+
+
+def test_prune_drops_missing_files(tmp_path):
+    kept = _file(tmp_path / "kept.tif")
+    removed = _file(tmp_path / "removed.tif")
+    with ResultCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        for filepath in (kept, removed):
+            _, key = cache.lookup(filepath)
+            cache.store(key, {'file': os.path.basename(filepath)})
+        os.remove(removed)
+        assert cache.prune() == 1
+        assert cache.lookup(kept)[0] == {'file': 'kept.tif'}
+
+        cache.clear()
+        assert cache.lookup(kept)[0] is None
@@ -0,0 +1,103 @@
+"""
+GeoTIFF Quality Report Generator
+JSON Lines, CSV and Parquet export rows
+"""
+
+import csv
+import json
+import math
+
+import pytest
+
+from app.export import BAND_COLUMNS, FILE_COLUMNS, band_rows, flatten_record, write_rows
+
+
+RECORD = {
+    'file': 'tile.tif',
+    'path': '/data/tile.tif',
+    'width': 100,
+    'height': 50,
+    'count': 2,
+    'dtype': 'float32',
+    'crs': 'EPSG:32633',
+    'transform': (10.0, 0.0, 500000.0, 0.0, -10.0, 4000000.0),
+    'bounds': (500000.0, 3999500.0, 501000.0, 4000000.0),
+    'nodata': float('nan'),
+    'file_size': 20000,
+    'area': 500000.0,
+    'valid_area': 400000.0,
+    'bands': [
+        {'band': 1, 'valid_pixels': 4000, 'total_pixels': 5000, 'min': 1.0, 'max': 9.0, 'mean': 5.0, 'std': 2.0,
+         'percentiles': {'p1': 1.0, 'p50': 5.0, 'p99': 9.0}},
+        {'band': 2, 'valid_pixels': 0, 'total_pixels': 5000},
+    ],
+}
+
+ERROR_RECORD = {'file': 'broken.tif', 'path': '/data/broken.tif', 'error': "not a TIFF"}
+
+
+def test_flatten_record():
+    row = flatten_record(RECORD)
+    assert [name for name, _ in FILE_COLUMNS] == list(row)
+    assert row['pixel_size_x'] == 10.0 and row['pixel_size_y'] == 10.0
+    assert (row['left'], row['top']) == (500000.0, 4000000.0)
+    assert (row['valid_pixels'], row['mean'], row['p50']) == (4000, 5.0, 5.0)
+    assert row['approximate'] is False and row['error'] is None
+
+    error_row = flatten_record(ERROR_RECORD)
+    assert error_row['error'] == "not a TIFF"
+    assert error_row['width'] is None
+
+
+def test_band_rows():
+    rows = list(band_rows([RECORD, ERROR_RECORD]))
+    assert [(row['file'], row['band']) for row in rows] == [('tile.tif', 1), ('tile.tif', 2)]
+    assert rows[0]['p99'] == 9.0
+    assert rows[1]['valid_pixels'] == 0 and rows[1]['mean'] is None
+
+
+def _read(path, fmt):
+    """Rows of an exported file, with CSV cells as written"""
+    if fmt == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            # parse_constant rejects NaN and Infinity tokens
+            return [json.loads(line, parse_constant=pytest.fail) for line in f]
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    import pyarrow.parquet as pq
+    return pq.read_table(path).to_pylist()
+
+
+@pytest.mark.parametrize('fmt', ['jsonl', 'csv', 'parquet'])
+def test_write_rows(tmp_path, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    rows = [flatten_record(RECORD), flatten_record(ERROR_RECORD)]
+    path = write_rows(str(tmp_path / f"files.{fmt}"), iter(rows), FILE_COLUMNS, fmt)
+    written = _read(path, fmt)
+
+    assert [row['file'] for row in written] == ['tile.tif', 'broken.tif']
+    assert list(written[0]) == [name for name, _ in FILE_COLUMNS]
+    if fmt == 'csv':
+        assert written[0]['width'] == '100' and written[1]['width'] == ''
+    else:
+        assert written[0]['width'] == 100 and written[0]['mean'] == 5.0
+        assert written[1]['width'] is None and written[1]['error'] == "not a TIFF"
+    if fmt == 'jsonl':
+        assert written[0]['nodata'] is None
+    elif fmt == 'parquet':
+        assert math.isnan(written[0]['nodata'])
+
+
+def test_bands_to_parquet_schema(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = write_rows(str(tmp_path / "bands.parquet"), band_rows([RECORD]), BAND_COLUMNS, 'parquet')
+    schema = pq.read_schema(path)
+    assert schema.names == [name for name, _ in BAND_COLUMNS]
+    assert str(schema.field('valid_pixels').type) == 'int64'
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_rows(str(tmp_path / "files.xml"), [], FILE_COLUMNS, 'xml')
@@ -0,0 +1,98 @@
+"""
+GeoTIFF Quality Report Generator
+PointGrid nearest-neighbour queries and block-grouped raster sampling
+compared against brute force and rasterio
+"""
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from app.gcp import PointGrid, height_rmse, sample_raster
+
+
+def _brute_force(points, queries, max_distance):
+    distances = np.hypot(queries[:, None, 0] - points[None, :, 0], queries[:, None, 1] - points[None, :, 1])
+    nearest = distances.argmin(axis=1)
+    best = distances[np.arange(len(queries)), nearest]
+    return np.where(best <= max_distance, nearest, -1), np.where(best <= max_distance, best, np.inf)
+
+
+@pytest.mark.parametrize('cell_size,max_distance', [(5.0, 5.0), (10.0, 3.0)])
+def test_nearest_within_matches_brute_force(cell_size, max_distance):
+    rng = np.random.default_rng(7)
+    points = rng.uniform(0, 200, (800, 2))
+    # Queries inside the grid, near points, and far outside its extent
+    queries = np.vstack([rng.uniform(-20, 220, (500, 2)),
+                         points[:100] + rng.normal(0, 2, (100, 2)),
+                         [[-1e6, 5], [1e6, 1e6]]])
+
+    grid = PointGrid(points, cell_size)
+    indices, distances = grid.nearest_within(queries, max_distance)
+    expected_indices, expected_distances = _brute_force(points, queries, max_distance)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances)
+
+
+def test_ties_go_to_first_point():
+    grid = PointGrid([[1, 0], [-1, 0], [0, 1]], 5.0)
+    indices, distances = grid.nearest_within([[0, 0]], 5.0)
+    assert indices.tolist() == [0]
+    assert distances.tolist() == [1.0]
+
+
+def test_empty_grid_and_radius_check():
+    indices, distances = PointGrid(np.empty((0, 2)), 5.0).nearest_within([[0, 0]], 5.0)
+    assert indices.tolist() == [-1]
+    assert distances.tolist() == [np.inf]
+    with pytest.raises(ValueError):
+        PointGrid([[0, 0]], 5.0).nearest_within([[0, 0]], 6.0)
+
+
+def _write_dem(path, options):
+    """Two-band 90x70 float32 raster with NoData patches and a NaN pixel"""
+    rng = np.random.default_rng(11)
+    data = rng.uniform(100, 500, (2, 70, 90)).astype('float32')
+    data[0, 10:20, 30:50] = -9999
+    data[1, 40:, :10] = -9999
+    data[0, 5, 5] = np.nan
+    with rasterio.open(path, 'w', driver='GTiff', width=90, height=70, count=2, dtype='float32', nodata=-9999,
+                       crs='EPSG:32633', transform=from_origin(1000, 2000, 2, 2), **options) as dst:
+        dst.write(data)
+
+
+@pytest.mark.parametrize('options', [{}, {'tiled': True, 'blockxsize': 16, 'blockysize': 32}])
+@pytest.mark.parametrize('bidx', [1, 2])
+def test_sample_raster_matches_rasterio(tmp_path, options, bidx):
+    path = tmp_path / "dem.tif"
+    _write_dem(path, options)
+    rng = np.random.default_rng(12)
+    # Points inside the raster, and some beyond each edge
+    xy = np.column_stack([rng.uniform(990, 1190, 400), rng.uniform(1850, 2010, 400)])
+    xy = np.vstack([xy, [[1011, 1989], [1000.5, 1999.5]]])
+
+    with rasterio.open(path) as src:
+        values, valid = sample_raster(src, xy, bidx)
+        expected = np.ma.array(list(src.sample(xy.tolist(), indexes=bidx, masked=True)))[:, 0]
+        left, bottom, right, top = src.bounds
+
+    inside = (xy[:, 0] >= left) & (xy[:, 0] < right) & (xy[:, 1] > bottom) & (xy[:, 1] <= top)
+    expected_valid = inside & ~np.ma.getmaskarray(expected) & ~np.isnan(np.ma.getdata(expected))
+    np.testing.assert_array_equal(valid, expected_valid)
+    np.testing.assert_array_equal(values[valid], np.ma.getdata(expected)[valid])
+    assert (~inside).any() and (inside & ~valid).any()
+
+
+def test_height_rmse(tmp_path):
+    path = tmp_path / "dem.tif"
+    _write_dem(path, {})
+    xy = np.array([[1001.0, 1999.0], [1100.0, 1900.0], [1071.0, 1969.0], [5000.0, 5000.0]])
+    with rasterio.open(path) as src:
+        raster_heights = np.array([value[0] for value in src.sample(xy[:3].tolist())])
+    heights = np.array([raster_heights[0] + 3, raster_heights[1] - 4, 123.0, 50.0])
+
+    rows, rmse = height_rmse(str(path), (['a', 'b', 'nodata', 'outside'], xy, None, {'h': heights}))
+
+    assert [row[0] for row in rows] == ['a', 'b']
+    assert rmse == pytest.approx(np.sqrt((9 + 16) / 2))
@@ -0,0 +1,73 @@
+"""
+GeoTIFF Quality Report Generator
+Polygon status and builtup classification on small fixtures
+"""
+
+import fiona
+import pytest
+from shapely.geometry import box, mapping
+
+from app.polygons import (BUILTUP_LAYERS, COMPLETED, CROSSING, OUTSIDE, PENDING, PENDING_LAYER, STATUS_FIELD,
+                          STATUS_LAYER, WITHIN, classify_builtup, mark_status)
+
+
+def _write_layer(path, geometries, layer=None):
+    """Write polygons with a 'name' attribute; None writes a feature without geometry"""
+    schema = {'geometry': 'Polygon', 'properties': {'name': 'str'}}
+    with fiona.open(path, 'w', driver='GPKG', layer=layer, schema=schema, crs='EPSG:32633') as sink:
+        sink.writerecords([{'geometry': mapping(geometry) if geometry is not None else None,
+                            'properties': {'name': name}} for name, geometry in geometries])
+    return str(path)
+
+
+def _read_layer(path, layer):
+    with fiona.open(path, layer=layer) as collection:
+        return [dict(feature.properties) for feature in collection]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_mark_status(tmp_path, workers):
+    available = _write_layer(tmp_path / "available.gpkg", [('a', box(0, 0, 10, 10)), ('b', box(20, 0, 30, 10))])
+    targets = _write_layer(tmp_path / "targets.gpkg", [
+        ('inside', box(1, 1, 5, 5)),
+        ('overlapping', box(8, 8, 12, 12)),
+        ('second', box(21, 1, 29, 9)),
+        ('outside', box(50, 50, 60, 60)),
+        ('spanning', box(5, 1, 25, 5)),
+        ('empty', None),
+    ])
+    output = str(tmp_path / "status.gpkg")
+
+    counts = mark_status(targets, available, output, workers=workers)
+
+    assert counts == {COMPLETED: 2, PENDING: 4}
+    assert _read_layer(output, STATUS_LAYER) == [
+        {'name': 'inside', STATUS_FIELD: COMPLETED},
+        {'name': 'overlapping', STATUS_FIELD: PENDING},
+        {'name': 'second', STATUS_FIELD: COMPLETED},
+        {'name': 'outside', STATUS_FIELD: PENDING},
+        {'name': 'spanning', STATUS_FIELD: PENDING},
+        {'name': 'empty', STATUS_FIELD: PENDING},
+    ]
+    assert [row['name'] for row in _read_layer(output, PENDING_LAYER)] == ['overlapping', 'outside', 'spanning',
+                                                                           'empty']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_classify_builtup(tmp_path, workers):
+    parcels = _write_layer(tmp_path / "parcels.gpkg", [('p1', box(0, 0, 10, 10)), ('p2', box(10, 0, 20, 10))])
+    builtup = _write_layer(tmp_path / "builtup.gpkg", [
+        ('house', box(1, 1, 3, 3)),
+        ('across', box(8, 2, 12, 4)),
+        ('edge', box(15, 8, 25, 12)),
+        ('field', box(40, 40, 45, 45)),
+        ('second', box(11, 1, 19, 9)),
+        ('empty', None),
+    ])
+    output = str(tmp_path / "builtup_classes.gpkg")
+
+    counts = classify_builtup(builtup, parcels, output, workers=workers)
+
+    assert counts == {WITHIN: 2, CROSSING: 2, OUTSIDE: 2, 'parcels': 2}
+    names = {label: [row['name'] for row in _read_layer(output, layer)] for label, layer in BUILTUP_LAYERS.items()}
+    assert names == {WITHIN: ['house', 'second'], CROSSING: ['across', 'edge'], OUTSIDE: ['field', 'empty']}
@@ -0,0 +1,84 @@
+"""
+GeoTIFF Quality Report Generator
+Memory-mapped statistics compared against rasterio reads
+"""
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from app.rawtiff import map_pixels
+from app.stats import RunningStats, mapped_band_statistics
+
+
+# (creation options) for each layout the memory map must understand
+LAYOUTS = {
+    'strip-pixel': {'interleave': 'pixel', 'blockysize': 7},
+    'strip-band': {'interleave': 'band', 'blockysize': 7},
+    'tile-pixel': {'interleave': 'pixel', 'tiled': True, 'blockxsize': 32, 'blockysize': 16},
+    'tile-band': {'interleave': 'band', 'tiled': True, 'blockxsize': 32, 'blockysize': 16},
+    'bigtiff': {'interleave': 'pixel', 'tiled': True, 'blockxsize': 16, 'blockysize': 16, 'BIGTIFF': 'YES'},
+    'big-endian': {'interleave': 'band', 'ENDIANNESS': 'BIG'},
+    'big-endian-tile': {'interleave': 'pixel', 'tiled': True, 'blockxsize': 16, 'blockysize': 16,
+                        'ENDIANNESS': 'BIG'},
+}
+
+
+def _write(path, dtype, nodata, options, empty_tile=False):
+    """Write a 3-band 70x45 GeoTIFF (partial edge tiles) with some NoData pixels
+
+    GDAL writes blocks that hold only NoData last, so with empty_tile the
+    blocks of a band-interleaved file are no longer stored in order.
+    """
+    rng = np.random.default_rng(1)
+    data = (rng.normal(100, 25, (3, 45, 70))).astype(dtype)
+    data[:, :3, :5] = nodata
+    data[1, 20:40, 60:] = nodata
+    if empty_tile:
+        data[1, 32:, 64:] = nodata
+    profile = {'driver': 'GTiff', 'width': 70, 'height': 45, 'count': 3, 'dtype': dtype,
+               'nodata': nodata, 'crs': 'EPSG:32633', 'transform': from_origin(500000, 4000000, 1, 1),
+               'compress': 'none', **options}
+    with rasterio.open(path, 'w', **profile) as dst:
+        dst.write(data)
+
+
+@pytest.mark.parametrize('dtype,nodata', [('uint16', 0), ('float32', -9999.0)])
+@pytest.mark.parametrize('layout', sorted(LAYOUTS))
+def test_mapped_statistics_match_read(tmp_path, layout, dtype, nodata):
+    path = tmp_path / f"{layout}.tif"
+    _write(path, dtype, nodata, LAYOUTS[layout])
+
+    with rasterio.open(path) as src:
+        raster = map_pixels(src)
+        assert raster is not None
+        mapped, total_pixels = mapped_band_statistics(src, raster)
+        block = src.read(masked=True)
+
+    expected = RunningStats(3)
+    expected.update(block)
+    assert total_pixels == 70 * 45
+    for index in range(3):
+        values = block[index].compressed().astype(np.float64)
+        stats = mapped.band(index)
+        assert stats['valid_pixels'] == values.size == expected.band(index)['valid_pixels']
+        assert stats['min'] == values.min()
+        assert stats['max'] == values.max()
+        assert stats['mean'] == pytest.approx(values.mean(), rel=1e-12)
+        assert stats['std'] == pytest.approx(values.std(), rel=1e-9)
+        assert stats['histogram'] == expected.band(index)['histogram']
+
+
+def test_blocks_out_of_order_are_not_mapped(tmp_path):
+    path = tmp_path / "unordered.tif"
+    _write(path, 'uint16', 0, LAYOUTS['tile-band'], empty_tile=True)
+    with rasterio.open(path) as src:
+        assert map_pixels(src) is None
+
+
+def test_compressed_file_is_not_mapped(tmp_path):
+    path = tmp_path / "deflate.tif"
+    _write(path, 'uint16', 0, {'compress': 'deflate'})
+    with rasterio.open(path) as src:
+        assert map_pixels(src) is None
@@ -0,0 +1,103 @@
+"""
+GeoTIFF Quality Report Generator
+Sharded runs merged back together compared against a single-node run
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from app.app import GeoTiffAnalyzer
+from app.shard import check_shards, in_shard
+
+
+SHARDS = 3
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Ten small GeoTIFFs over two folders, plus one unreadable file"""
+    root = tmp_path / "corpus"
+    rng = np.random.default_rng(0)
+    for number in range(10):
+        folder = root / ("east" if number % 2 else "west")
+        folder.mkdir(parents=True, exist_ok=True)
+        count = 1 + number % 3
+        data = rng.integers(0, 1000, (count, 20, 30)).astype('uint16')
+        data[:, :2, :] = 0
+        with rasterio.open(folder / f"tile_{number}.tif", 'w', driver='GTiff', width=30, height=20, count=count,
+                           dtype='uint16', nodata=0 if number != 4 else None,
+                           crs='EPSG:4326' if number % 4 else 'EPSG:32633',
+                           transform=from_origin(number * 0.5, 50, 0.01, 0.01)) as dst:
+            dst.write(data)
+    (root / "west" / "broken.tif").write_bytes(b"not a tiff")
+    return str(root)
+
+
+def _analyzer(root, output_dir, shard=None):
+    analyzer = GeoTiffAnalyzer()
+    analyzer.roots = [root]
+    analyzer.folder = root
+    analyzer.recursive = True
+    analyzer.shard = shard
+    analyzer.output_path = os.path.join(output_dir, "report.pdf")
+    return analyzer
+
+
+def _state(analyzer):
+    """Everything the report and exports are built from"""
+    # Partials hold records as JSON, so tuples come back as lists
+    records = json.loads(json.dumps([{key: value for key, value in record.items() if key != 'diagnostics'}
+                                     for record in analyzer.file_records]))
+    return {
+        'files': analyzer.geotiff_files,
+        'records': records,
+        'datum': dict(analyzer.datum_summary),
+        'pixel_sizes': dict(analyzer.pixel_size_summary),
+        'total_area': analyzer.total_area,
+        'valid_area': analyzer.valid_area,
+        'issues': list(analyzer._issue_rows()),
+        'summary': list(analyzer._summary_rows()),
+    }
+
+
+def _partials(root, output_dir, shards):
+    return [_analyzer(root, output_dir, shard).generate_partial() for shard in shards]
+
+
+def test_merged_partials_equal_single_run(corpus, tmp_path):
+    single = _analyzer(corpus, str(tmp_path))
+    single.analyze_files()
+
+    paths = _partials(corpus, str(tmp_path), [(index, SHARDS) for index in range(SHARDS)])
+    merged = _analyzer(corpus, str(tmp_path))
+    aggregates = merged.merge_partials(list(reversed(paths)))
+
+    assert aggregates['files'] == len(single.file_records) == 11
+    assert _state(merged) == _state(single)
+
+
+def test_shard_split_is_relative_to_root():
+    for name in ("tile_1.tif", "east/tile_3.tif", "a\\b.tif"):
+        assert sum(in_shard(name, (index, SHARDS)) for index in range(SHARDS)) == 1
+    assert in_shard("east\\tile_3.tif", (0, 2)) == in_shard("east/tile_3.tif", (0, 2))
+
+
+def test_duplicate_or_mixed_shards_are_rejected(corpus, tmp_path):
+    paths = _partials(corpus, str(tmp_path), [(0, SHARDS), (1, SHARDS)])
+    with pytest.raises(ValueError, match="more than once"):
+        _analyzer(corpus, str(tmp_path)).merge_partials([paths[0], paths[0], paths[1]])
+
+    (tmp_path / "other").mkdir()
+    other = _partials(corpus, str(tmp_path / "other"), [(1, 2)])
+    with pytest.raises(ValueError, match="different shard counts"):
+        _analyzer(corpus, str(tmp_path)).merge_partials([paths[0], other[0]])
+
+
+def test_missing_shards_are_reported():
+    headers = [{'version': "1", 'shard': [index, 4]} for index in (0, 2)]
+    assert check_shards(headers) == [1, 3]
@@ -0,0 +1,62 @@
+"""
+GeoTIFF Quality Report Generator
+QuantileSketch accuracy, merging and serialization
+"""
+
+import numpy as np
+import pytest
+
+from app.sketch import RELATIVE_ACCURACY, QuantileSketch
+
+
+def _sketch(values):
+    sketch = QuantileSketch()
+    sketch.add_array(np.asarray(values, dtype=np.float64))
+    return sketch
+
+
+def test_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(3).lognormal(3, 1, 20000)
+    values[:500] *= -1
+    sketch = _sketch(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        # The sketch returns the value at rank q * (n - 1), like 'lower' interpolation
+        expected = np.quantile(values, q, method='lower')
+        assert sketch.quantile(q) == pytest.approx(expected, rel=RELATIVE_ACCURACY)
+
+
+def test_non_finite_values_are_ignored():
+    sketch = _sketch([np.nan, np.inf, -np.inf, 0.0, 2.0])
+    assert sketch.count == 2
+    assert sketch.quantile(0) == 0.0
+
+
+def test_merge_equals_single_sketch():
+    values = np.random.default_rng(4).normal(0, 50, 10000)
+    merged = QuantileSketch()
+    for part in np.array_split(values, 7):
+        merged.merge(_sketch(part))
+    assert merged.to_dict() == _sketch(values).to_dict()
+    assert merged.count == values.size
+
+
+def test_subtract_undoes_merge():
+    rng = np.random.default_rng(5)
+    first = _sketch(rng.normal(10, 5, 3000))
+    second = _sketch(rng.normal(-10, 5, 3000))
+    merged = QuantileSketch()
+    merged.merge(first)
+    merged.merge(second)
+    merged.subtract(second)
+    assert merged.to_dict() == first.to_dict()
+    assert merged.count == first.count
+    merged.subtract(first)
+    assert merged.count == 0
+    assert merged.quantile(0.5) is None
+
+
+def test_dict_round_trip():
+    sketch = _sketch([-3.0, 0.0, 0.0, 1.5, 1000.0])
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored.count == sketch.count
+    assert restored.percentiles() == sketch.percentiles()
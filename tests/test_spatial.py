@@ -0,0 +1,49 @@
+"""
+GeoTIFF Quality Report Generator
+BoxIndex queries compared against brute force
+"""
+
+import random
+
+from app.spatial import BoxIndex, boxes_overlap, find_overlapping_pairs
+
+
+def _boxes(count, seed):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        left = rng.uniform(0, 1000)
+        bottom = rng.uniform(0, 1000)
+        boxes.append((left, bottom, left + rng.uniform(0, 50), bottom + rng.uniform(0, 50)))
+    return boxes
+
+
+def _intersects(a, b):
+    return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+
+def test_query_matches_brute_force():
+    boxes = _boxes(1500, seed=1)
+    index = BoxIndex(boxes, node_capacity=8)
+    assert len(index) == len(boxes)
+    for query in _boxes(200, seed=2):
+        expected = [i for i, box in enumerate(boxes) if _intersects(box, query)]
+        assert sorted(index.query(query)) == expected
+
+
+def test_query_includes_touching_edges():
+    index = BoxIndex([(0, 0, 1, 1), (2, 2, 3, 3)])
+    assert sorted(index.query((1, 1, 2, 2))) == [0, 1]
+    assert index.query((1.5, 0, 1.6, 1)) == []
+
+
+def test_empty_and_single_box():
+    assert BoxIndex([]).query((0, 0, 1, 1)) == []
+    assert BoxIndex([(0, 0, 1, 1)]).query((0.5, 0.5, 2, 2)) == [0]
+
+
+def test_overlapping_pairs_match_brute_force():
+    boxes = _boxes(600, seed=3) + [(0, 0, 10, 10), (10, 0, 20, 10)]
+    expected = [(i, j) for i in range(len(boxes)) for j in range(i + 1, len(boxes))
+                if boxes_overlap(boxes[i], boxes[j])]
+    assert find_overlapping_pairs(boxes) == expected
@@ -0,0 +1,48 @@
+"""
+GeoTIFF Quality Report Generator
+RunningStats merging compared against whole-array statistics
+"""
+
+import numpy as np
+import pytest
+
+from app.stats import RunningStats
+
+
+def test_merge_matches_single_pass():
+    rng = np.random.default_rng(2)
+    values = rng.normal(500, 120, (2, 40000))
+    valid = rng.random((2, 40000)) > 0.1
+    valid[1, :] = False
+    valid[1, 100:200] = True
+
+    merged = RunningStats(2)
+    for part_values, part_valid in zip(np.array_split(values, 9, axis=1), np.array_split(valid, 9, axis=1)):
+        part = RunningStats(2)
+        part.update_values(part_values, part_valid)
+        merged.merge(part)
+
+    single = RunningStats(2)
+    single.update_values(values, valid)
+    for index in range(2):
+        expected = values[index][valid[index]]
+        stats = merged.band(index)
+        assert stats['valid_pixels'] == expected.size
+        assert stats['min'] == expected.min()
+        assert stats['max'] == expected.max()
+        assert stats['mean'] == pytest.approx(expected.mean(), rel=1e-12)
+        assert stats['std'] == pytest.approx(expected.std(), rel=1e-9)
+        assert stats['histogram'] == single.band(index)['histogram']
+
+
+def test_merge_with_empty_parts():
+    values = np.arange(12, dtype=np.float64).reshape(1, 12)
+    merged = RunningStats(1)
+    merged.merge(RunningStats(1))
+    part = RunningStats(1)
+    part.update_values(values, np.ones_like(values, dtype=bool))
+    merged.merge(part)
+    merged.merge(RunningStats(1))
+    assert merged.band(0)['mean'] == pytest.approx(5.5)
+    assert merged.band(0)['std'] == pytest.approx(values.std())
+    assert RunningStats(1).band(0) == {'valid_pixels': 0}
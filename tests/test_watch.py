@@ -0,0 +1,98 @@
+"""
+GeoTIFF Quality Report Generator
+Folder watching and incremental updates compared against a fresh run
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from app.app import GeoTiffAnalyzer
+from app.watch import FolderWatcher
+
+
+def _write(path, seed, nodata=0, crs='EPSG:32633', count=1):
+    data = np.random.default_rng(seed).integers(1, 1000, (count, 20, 30)).astype('uint16')
+    data[:, :3, :] = 0
+    with rasterio.open(path, 'w', driver='GTiff', width=30, height=20, count=count, dtype='uint16', nodata=nodata,
+                       crs=crs, transform=from_origin(seed * 300, 5000, 10, 10)) as dst:
+        dst.write(data)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    root = tmp_path / "delivery"
+    root.mkdir()
+    _write(root / "a.tif", 1)
+    _write(root / "b.tif", 2, nodata=None)
+    _write(root / "c.tif", 3, crs='EPSG:4326', count=2)
+    _write(root / "d.tif", 4)
+    (root / "broken.tif").write_bytes(b"not a tiff")
+    return str(root)
+
+
+def _analyzer(folder):
+    analyzer = GeoTiffAnalyzer()
+    analyzer.roots = [folder]
+    analyzer.folder = folder
+    analyzer.retain_histograms = True
+    analyzer.analyze_files()
+    return analyzer
+
+
+def _state(analyzer):
+    """Everything the report and exports are built from"""
+    return {
+        'files': analyzer.geotiff_files,
+        'datum': dict(analyzer.datum_summary),
+        'pixel_sizes': dict(analyzer.pixel_size_summary),
+        'total_area': pytest.approx(analyzer.total_area),
+        'valid_area': pytest.approx(analyzer.valid_area),
+        'issues': list(analyzer._issue_rows()),
+        'issue_counts': dict(analyzer.quality_issues.by_code),
+        'files_with_issues': analyzer.quality_issues.files_with_issues,
+        # Order within raster_stats is not reported
+        'raster_stats': sorted((s['file'], s['min'], s['max'], s['mean']) for s in analyzer.raster_stats),
+        'percentiles': {band: sketch.percentiles() for band, sketch in analyzer.value_sketches.items()},
+        'sketch_counts': {band: sketch.count for band, sketch in analyzer.value_sketches.items()},
+    }
+
+
+def test_incremental_update_equals_fresh_run(folder):
+    watched = _analyzer(folder)
+
+    # Change one file, remove another, add a new one and fix the broken one
+    _write(os.path.join(folder, "a.tif"), 10)
+    os.remove(os.path.join(folder, "d.tif"))
+    shutil.copy(os.path.join(folder, "c.tif"), os.path.join(folder, "e.tif"))
+    _write(os.path.join(folder, "broken.tif"), 5)
+    changed = [(name, os.path.join(folder, name)) for name in ("a.tif", "e.tif", "broken.tif")]
+    watched._apply_changes(changed, [os.path.join(folder, "d.tif")], None)
+
+    fresh = _analyzer(folder)
+    assert sorted(watched.geotiff_files) == sorted(fresh.geotiff_files)
+    watched_state, fresh_state = _state(watched), _state(fresh)
+    watched_state['files'] = sorted(watched_state['files'])
+    fresh_state['files'] = sorted(fresh_state['files'])
+    watched_state['issues'].sort(key=lambda row: (row['file'], row['code']))
+    fresh_state['issues'].sort(key=lambda row: (row['file'], row['code']))
+    assert watched_state == fresh_state
+
+
+def test_changes_are_reported_once_settled(folder):
+    watcher = FolderWatcher([folder])
+    watcher.prime()
+    assert watcher.scan() == ([], [])
+
+    path = os.path.join(folder, "new.tif")
+    _write(path, 6)
+    assert watcher.scan() == ([], [])
+    assert watcher.scan() == ([("new.tif", path)], [])
+    assert watcher.scan() == ([], [])
+
+    os.remove(os.path.join(folder, "a.tif"))
+    assert watcher.scan() == ([], [os.path.join(folder, "a.tif")])